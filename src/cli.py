@@ -2,21 +2,33 @@ import settings
 import click
 import asyncio
 
-from utils import async_click
-from core.core import Repo2PipeCore
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from utils import async_click, write_file
 
 
 @click.command()
-@click.option("--type", default="gitlab", help="CI/CD pipline type")
+@click.option("--type", type=click.Choice(["gitlab", "jenkins"]), default="gitlab", help="CI/CD pipline type")
 @click.option("-o", "--output", default=".", help="Путь к директории, куда сохранить результат",)
 @click.argument("repository")
 @click.argument("branch", default="master")
 @async_click
 async def main(repository: str, branch: str, type: str, output: str = "./"):
+    # ядро (pydantic, GitPython и т.д.) импортируем только когда реально работаем,
+    # чтобы --help и ошибки разбора аргументов отрабатывали мгновенно
+    from core.core import Repo2PipeCore
+
     click.echo(settings.LOGO + "\n")
 
+    # Один ограниченный пул на весь запуск для asyncio.to_thread / run_in_executor
+    # (git clone и прочая блокирующая работа), вместо дефолтного пула asyncio.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=4, thread_name_prefix="repo2pipe")
+    )
+
     repo2pipe = Repo2PipeCore(branch)
-    result = await repo2pipe.create_pipline(
+    template, _, warnings, _ = await repo2pipe.create_pipline(
         repository=repository,
         branch=branch,
         pipeline_type=type,
@@ -24,27 +36,26 @@ async def main(repository: str, branch: str, type: str, output: str = "./"):
 
     ci_type = type
 
-    template = result.ci_templates.get(ci_type)
     if not template:
         raise click.ClickException(
-            f"CI type '{ci_type}' не найден в ci_templates. "
-            f"Доступные: {list(result.ci_templates.keys())}"
+            f"CI-шаблон '{ci_type}' не сгенерирован. " + " ".join(warnings)
         )
 
     click.echo(template)
 
 
     default_names = { "gitlab": ".gitlab-ci.yml", "jenkins": "Jenkinsfile" }
-    filename = default_names.get(ci_type, f"{ci_type}_pipeline.txt")
-    output += ("" if output[-1:] == "/" else "/") + filename 
+    filename = default_names[ci_type]
+    out_path = Path(output) / filename
 
+    data = template.encode("utf-8")
     try:
-        with open(output, "w", encoding="utf-8") as f:
-            f.write(template)
+        # не блокируем event loop на записи файла
+        await asyncio.to_thread(write_file, out_path, data)
     except OSError as e:
-        click.echo(f"Не удалось сохранить YAML в файл '{output}': {e}", err=True)
+        click.echo(f"Не удалось сохранить YAML в файл '{out_path}': {e}", err=True)
     else:
-        click.echo(f"YAML сохранён в файл: {output}", err=True)
+        click.echo(f"YAML сохранён в файл: {out_path} ({len(data)} байт)", err=True)
 
 
 if __name__ == "__main__":
@@ -1,12 +1,21 @@
 import asyncio
-import threading
-import time
+import itertools
 import sys
 from typing import Any, Awaitable, Callable, TypeVar
 
 T = TypeVar("T")
 
 
+async def _spinner(text: str, interval: float, stop: asyncio.Event) -> None:
+    # кадры готовим один раз, дальше просто крутим их по кругу
+    frames = itertools.cycle(tuple(f"\r{text} {c}" for c in "|/-\\"))
+    while not stop.is_set():
+        # один write + один flush на кадр
+        sys.stdout.write(next(frames))
+        sys.stdout.flush()
+        await asyncio.sleep(interval)
+
+
 async def run(
     func: Callable[..., Awaitable[T]],
     *args: Any,
@@ -15,28 +24,15 @@ async def run(
     **kwargs: Any,
 ) -> T:
     """
-    Запускает асинхронную функцию func и крутит спиннер в ОТДЕЛЬНОМ потоке,
-    пока функция не завершится.
-    """
-    spinner_chars = "|/-\\"
-    stop_event = threading.Event()
-
-    def spinner():
-        i = 0
-        while not stop_event.is_set():
-            frame = spinner_chars[i % len(spinner_chars)]
-            sys.stdout.write(f"\r{text} {frame}")
-            sys.stdout.flush()
-            i += 1
-            time.sleep(interval)
-
+    Запускает асинхронную функцию func и крутит спиннер отдельной задачей
+    в том же event loop, пока функция не завершится.
 
-        clear_len = len(text) + 2
-        sys.stdout.write("\r" + " " * clear_len + "\r")
-        sys.stdout.flush()
-
-    thread = threading.Thread(target=spinner, daemon=True)
-    thread.start()
+    Блокирующую работу func должна сама выносить в поток (asyncio.to_thread),
+    иначе спиннер не сможет обновляться.
+    """
+    clear = "\r" + " " * (len(text) + 2) + "\r"
+    stop = asyncio.Event()
+    task = asyncio.create_task(_spinner(text, interval, stop))
 
     success = False
 
@@ -48,15 +44,10 @@ async def run(
         success = False
         raise
     finally:
-        stop_event.set()
-        await asyncio.to_thread(thread.join)
+        stop.set()
+        await task
 
-
-        sys.stdout.write("\r" + " " * (len(text) + 2) + "\r")
+        # затираем спиннер и печатаем итог одной записью
+        status = "✅ Успешно" if success else "❌ Ошибка"
+        sys.stdout.write(f"{clear}{text} - {status}\n")
         sys.stdout.flush()
-
-        if success:
-            sys.stdout.write(f"{text} - ✅ Успешно\n")
-        else:
-            sys.stdout.write(f"{text} - ❌ Ошибка\n")
-        sys.stdout.flush()
\ No newline at end of file
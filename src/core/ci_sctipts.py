@@ -1,7 +1,8 @@
 # core/ci_scripts.py
 from __future__ import annotations
 
-from typing import List, Literal
+from functools import lru_cache
+from typing import List, Literal, Tuple
 
 
 NodeKind = Literal["lint", "tests", "build", "sonar"]
@@ -25,6 +26,15 @@ def _normalize_kind(kind: str) -> str:
 # Node / JavaScript / pnpm
 # =========================
 
+_NODE_CMDS: dict[str, str] = {
+    "lint": "pnpm lint || echo 'pnpm lint не настроен — отредактируйте команду'",
+    "test": "pnpm test || echo 'pnpm test не настроен — отредактируйте команду'",
+    "build": "pnpm build || echo 'pnpm build не настроен — отредактируйте команду'",
+    # Не навязываем конкретную команду — просто подсказка
+    "sonar": "echo 'TODO: добавьте команду запуска SonarQube для фронтенда (например, npx sonar-scanner ...)'",
+}
+
+
 def make_node_script(kind: NodeKind) -> List[str]:
     """
     Генерирует script для Node-проектов (pnpm).
@@ -34,37 +44,48 @@ def make_node_script(kind: NodeKind) -> List[str]:
       - 'build' -> pnpm build
       - 'sonar' -> placeholder под запуск sonar-scanner
     """
+    return list(_node_script(kind))
+
+
+@lru_cache(maxsize=None)
+def _node_script(kind: str) -> Tuple[str, ...]:
     normalized = _normalize_kind(kind)
-    job_name = f"node_{kind}"
 
-    cmds: List[str] = [
-        f"echo 'Job: {job_name}'",
+    try:
+        cmd = _NODE_CMDS[normalized]
+    except KeyError:
+        raise ValueError(f"Unsupported node job kind: {kind}") from None
+
+    return (
+        f"echo 'Job: node_{kind}'",
         # pnpm в node:20-alpine нет из коробки -> ставим через corepack или npm
         "corepack enable || npm i -g pnpm",
         "pnpm install",
-    ]
-
-    if normalized == "lint":
-        cmds.append("pnpm lint || echo 'pnpm lint не настроен — отредактируйте команду'")
-    elif normalized == "test":
-        cmds.append("pnpm test || echo 'pnpm test не настроен — отредактируйте команду'")
-    elif normalized == "build":
-        cmds.append("pnpm build || echo 'pnpm build не настроен — отредактируйте команду'")
-    elif normalized == "sonar":
-        # Не навязываем конкретную команду — просто подсказка
-        cmds.append(
-            "echo 'TODO: добавьте команду запуска SonarQube для фронтенда (например, npx sonar-scanner ...)'"
-        )
-    else:
-        raise ValueError(f"Unsupported node job kind: {kind}")
-
-    return cmds
+        cmd,
+    )
 
 
 # =========
 # Java / mvn
 # =========
 
+# kind -> (goal для mvn, подсказка при ошибке)
+_JAVA_GOALS: dict[str, tuple[str, str]] = {
+    "test": (
+        "test",
+        "mvn test завершился с ошибкой — отредактируйте pom.xml/профили",
+    ),
+    "build": (
+        "package -DskipTests",
+        "mvn package завершился с ошибкой — проверьте pom.xml",
+    ),
+    "sonar": (
+        "verify sonar:sonar",
+        "SonarQube не настроен — укажите параметры sonar.* и переменные окружения SONAR_*",
+    ),
+}
+
+
 def make_java_script(kind: JavaKind) -> List[str]:
     """
     Генерирует script для Java-проектов.
@@ -76,35 +97,82 @@ def make_java_script(kind: JavaKind) -> List[str]:
       - 'build' -> mvn package -DskipTests
       - 'sonar' -> mvn verify sonar:sonar
     """
+    return list(_java_script(kind))
+
+
+@lru_cache(maxsize=None)
+def _java_script(kind: str) -> Tuple[str, ...]:
     normalized = _normalize_kind(kind)
-    job_name = f"java_{kind}"
-
-    if normalized == "test":
-        goal = "test"
-        error_hint = "mvn test завершился с ошибкой — отредактируйте pom.xml/профили"
-    elif normalized == "build":
-        goal = "package -DskipTests"
-        error_hint = "mvn package завершился с ошибкой — проверьте pom.xml"
-    elif normalized == "sonar":
-        goal = "verify sonar:sonar"
-        error_hint = (
-            "SonarQube не настроен — укажите параметры sonar.* и переменные окружения SONAR_*"
-        )
-    else:
-        raise ValueError(f"Unsupported java job kind: {kind}")
-
-    cmds: List[str] = [
-        f"echo 'Job: {job_name}'",
+
+    try:
+        goal, error_hint = _JAVA_GOALS[normalized]
+    except KeyError:
+        raise ValueError(f"Unsupported java job kind: {kind}") from None
+
+    return (
+        f"echo 'Job: java_{kind}'",
         "[ -f mvnw ] && chmod +x mvnw || echo 'mvnw не найден, используем mvn из образа'",
         f"./mvnw -B {goal} || mvn -B {goal} || echo '{error_hint}'",
-    ]
-    return cmds
+    )
 
 
 # =====================
 # Python (+pip/poetry)
 # =====================
 
+_PIP_INSTALL = (
+    "python -m pip install -r requirements.txt "
+    "|| echo 'requirements.txt не найден — настройте зависимости для Python-проекта'"
+)
+_POETRY_INSTALL = "poetry install || echo 'poetry install завершился с ошибкой — проверьте pyproject.toml'"
+_PIPENV_INSTALL = "pipenv install || echo 'pipenv install завершился с ошибкой — проверьте Pipfile'"
+
+_PY_MANAGERS = ("pip", "poetry", "pipenv")
+
+# (manager, kind) -> команды job'а без echo-заголовка
+_PY_TABLE: dict[tuple[str, str], tuple[str, ...]] = {
+    ("pip", "lint"): (
+        _PIP_INSTALL,
+        "python -m pip install flake8 || true",
+        "flake8 . || echo 'flake8 завершился с ошибкой — настройте конфиг или зависимости'",
+    ),
+    ("pip", "test"): (
+        _PIP_INSTALL,
+        "python -m pip install pytest || true",
+        "pytest || echo 'pytest завершился с ошибкой — проверьте тесты и зависимости'",
+    ),
+    ("pip", "build"): (
+        _PIP_INSTALL,
+        "python -m pip install build || true",
+        "python -m build || echo 'Команда сборки не настроена — отредактируйте build-конфигурацию'",
+    ),
+    ("poetry", "lint"): (
+        _POETRY_INSTALL,
+        "poetry run flake8 . || echo 'flake8 завершился с ошибкой — настройте конфиг или зависимости'",
+    ),
+    ("poetry", "test"): (
+        _POETRY_INSTALL,
+        "poetry run pytest || echo 'pytest завершился с ошибкой — проверьте тесты и зависимости'",
+    ),
+    ("poetry", "build"): (
+        _POETRY_INSTALL,
+        "poetry build || echo 'poetry build завершился с ошибкой — проверьте pyproject.toml'",
+    ),
+    ("pipenv", "lint"): (
+        _PIPENV_INSTALL,
+        "pipenv run flake8 . || echo 'flake8 завершился с ошибкой — настройте конфиг или зависимости'",
+    ),
+    ("pipenv", "test"): (
+        _PIPENV_INSTALL,
+        "pipenv run pytest || echo 'pytest завершился с ошибкой — проверьте тесты и зависимости'",
+    ),
+    ("pipenv", "build"): (
+        _PIPENV_INSTALL,
+        "pipenv run python -m build || echo 'Команда сборки не настроена — проверьте конфигурацию'",
+    ),
+}
+
+
 def make_python_script(
     kind: PythonKind,
     manager: PythonManager = "pip",
@@ -124,107 +192,32 @@ def make_python_script(
     Предполагается, что job добавляется ТОЛЬКО если в проекте реально есть
     нужный менеджер (requirements.txt/pyproject.toml/Pipfile).
     """
+    return list(_python_script(kind, manager))
+
+
+@lru_cache(maxsize=None)
+def _python_script(kind: str, manager: str) -> Tuple[str, ...]:
     normalized = _normalize_kind(kind)
-    job_name = f"python_{kind}"
-
-    cmds: List[str] = [f"echo 'Job: {job_name}'"]
-
-    if manager == "pip":
-        install_cmd = (
-            "python -m pip install -r requirements.txt "
-            "|| echo 'requirements.txt не найден — настройте зависимости для Python-проекта'"
-        )
-
-        if normalized == "lint":
-            cmds.extend(
-                [
-                    install_cmd,
-                    "python -m pip install flake8 || true",
-                    "flake8 . || echo 'flake8 завершился с ошибкой — настройте конфиг или зависимости'",
-                ]
-            )
-        elif normalized == "test":
-            cmds.extend(
-                [
-                    install_cmd,
-                    "python -m pip install pytest || true",
-                    "pytest || echo 'pytest завершился с ошибкой — проверьте тесты и зависимости'",
-                ]
-            )
-        elif normalized == "build":
-            cmds.extend(
-                [
-                    install_cmd,
-                    "python -m pip install build || true",
-                    "python -m build || echo 'Команда сборки не настроена — отредактируйте build-конфигурацию'",
-                ]
-            )
-        else:
-            raise ValueError(f"Unsupported python job kind: {kind}")
-
-    elif manager == "poetry":
-        base_install = "poetry install || echo 'poetry install завершился с ошибкой — проверьте pyproject.toml'"
-
-        if normalized == "lint":
-            cmds.extend(
-                [
-                    base_install,
-                    "poetry run flake8 . || echo 'flake8 завершился с ошибкой — настройте конфиг или зависимости'",
-                ]
-            )
-        elif normalized == "test":
-            cmds.extend(
-                [
-                    base_install,
-                    "poetry run pytest || echo 'pytest завершился с ошибкой — проверьте тесты и зависимости'",
-                ]
-            )
-        elif normalized == "build":
-            cmds.extend(
-                [
-                    base_install,
-                    "poetry build || echo 'poetry build завершился с ошибкой — проверьте pyproject.toml'",
-                ]
-            )
-        else:
-            raise ValueError(f"Unsupported python job kind: {kind}")
-
-    elif manager == "pipenv":
-        base_install = "pipenv install || echo 'pipenv install завершился с ошибкой — проверьте Pipfile'"
-
-        if normalized == "lint":
-            cmds.extend(
-                [
-                    base_install,
-                    "pipenv run flake8 . || echo 'flake8 завершился с ошибкой — настройте конфиг или зависимости'",
-                ]
-            )
-        elif normalized == "test":
-            cmds.extend(
-                [
-                    base_install,
-                    "pipenv run pytest || echo 'pytest завершился с ошибкой — проверьте тесты и зависимости'",
-                ]
-            )
-        elif normalized == "build":
-            cmds.extend(
-                [
-                    base_install,
-                    "pipenv run python -m build || echo 'Команда сборки не настроена — проверьте конфигурацию'",
-                ]
-            )
-        else:
-            raise ValueError(f"Unsupported python job kind: {kind}")
-
-    else:
-        raise ValueError(f"Unsupported python manager: {manager}")
-
-    return cmds
+
+    cmds = _PY_TABLE.get((manager, normalized))
+    if cmds is None:
+        if manager not in _PY_MANAGERS:
+            raise ValueError(f"Unsupported python manager: {manager}")
+        raise ValueError(f"Unsupported python job kind: {kind}")
+
+    return (f"echo 'Job: python_{kind}'", *cmds)
 
 
 # ===========
 # Go / golang
 # ===========
+_GO_CMDS: dict[str, str] = {
+    "lint": "go vet ./... || echo 'go vet завершился с ошибкой — проверьте код/зависимости'",
+    "test": "go test ./... || echo 'go test завершился с ошибкой — проверьте тесты/зависимости'",
+    "build": "go build ./... || echo 'go build завершился с ошибкой — проверьте main-пакет и зависимости'",
+}
+
+
 def make_go_script(kind: GoKind) -> List[str]:
     """
     Генерирует script для Go-проектов.
@@ -233,18 +226,16 @@ def make_go_script(kind: GoKind) -> List[str]:
       - 'tests' -> go test ./...
       - 'build' -> go build ./...
     """
-    normalized = _normalize_kind(kind)
-    job_name = f"go_{kind}"
+    return list(_go_script(kind))
+
 
-    cmds: List[str] = [f"echo 'Job: {job_name}'"]
+@lru_cache(maxsize=None)
+def _go_script(kind: str) -> Tuple[str, ...]:
+    normalized = _normalize_kind(kind)
 
-    if normalized == "lint":
-        cmds.append("go vet ./... || echo 'go vet завершился с ошибкой — проверьте код/зависимости'")
-    elif normalized == "test":
-        cmds.append("go test ./... || echo 'go test завершился с ошибкой — проверьте тесты/зависимости'")
-    elif normalized == "build":
-        cmds.append("go build ./... || echo 'go build завершился с ошибкой — проверьте main-пакет и зависимости'")
-    else:
-        raise ValueError(f"Unsupported go job kind: {kind}")
+    try:
+        cmd = _GO_CMDS[normalized]
+    except KeyError:
+        raise ValueError(f"Unsupported go job kind: {kind}") from None
 
-    return cmds
+    return (f"echo 'Job: go_{kind}'", cmd)
@@ -13,4 +13,11 @@ BASE_TEMP_DIR = Path(
     os.getenv("SELFDEPLOY_WORKDIR", gettempdir())
 ) / "selfdeploy"
 
-BASE_TEMP_DIR.mkdir(parents=True, exist_ok=True)
+def ensure_base_temp_dir() -> Path:
+    """
+    Создаёт BASE_TEMP_DIR при обращении (а не при импорте модуля) и возвращает его.
+    mkdir выполняется на каждый вызов: каталог могут удалить между запусками
+    (tmp-cleaner, очищенный том SELFDEPLOY_WORKDIR).
+    """
+    BASE_TEMP_DIR.mkdir(parents=True, exist_ok=True)
+    return BASE_TEMP_DIR
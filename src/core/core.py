@@ -1,15 +1,75 @@
+import hashlib
+import json
+
 from .animation import run as run_animation
 from .renders import gitlab as gitlab_render, jenkins as jenkins_render
 from .services.analyzer import core as analyzer
 from .services.builders import pipeline as builder
-from .services.git_module import GitRepo2Pipe
 from .services.git_module.models import LocalRepo
 from .services.git_module.exceptions import GitExceptions
-from .models import AnalyzeResponse, StackInfo
+from .models import AnalyzeResponse, PipelineSummary, StackInfo
+
+from model import Pipeline
+
+
+# Тип CI -> модуль рендера (progress + render_text)
+_RENDER_MODULES = {
+    "gitlab": gitlab_render,
+    "jenkins": jenkins_render,
+}
+
+# Тип CI -> функция рендера абстрактного пайплайна
+RENDERERS = {kind: module.render for kind, module in _RENDER_MODULES.items()}
+
+# LRU-кэш отрендеренных шаблонов: (тип CI, хэш пайплайна) -> текст шаблона.
+# Рендер — чистая функция от структуры пайплайна, поэтому одинаковые пайплайны
+# (повторные запросы по тому же/похожему репозиторию) отдаются из кэша.
+# Используется только в create_pipelines: в разовом CLI-запуске попадания нет.
+_RENDER_CACHE_SIZE = 128
+_render_cache: dict[tuple[str, str], str] = {}
+
+
+def _pipeline_key(pipeline: Pipeline) -> str:
+    payload = json.dumps(pipeline.to_dict(), sort_keys=True).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _render_cached(kind: str, pipeline: Pipeline, pipeline_key: str) -> str:
+    """
+    Рендерит шаблон через LRU-кэш. Прогресс печатается и при попадании в кэш,
+    чтобы вывод в консоль не зависел от его состояния.
+    """
+    module = _RENDER_MODULES[kind]
+    key = (kind, pipeline_key)
+    with module.progress(pipeline):
+        # pop + повторная вставка переносит запись в конец (самая свежая)
+        template = _render_cache.pop(key, None)
+        if template is None:
+            template = module.render_text(pipeline)
+            if len(_render_cache) >= _RENDER_CACHE_SIZE:
+                # выкидываем давно не использованную запись (dict сохраняет порядок вставки)
+                _render_cache.pop(next(iter(_render_cache)))
+        _render_cache[key] = template
+    return template
+
+
+def _adopt(current: list[str], produced: list[str]) -> list[str]:
+    """
+    Сливает свежий список логов/варнингов из анализатора/билдера в накопленный.
+    Эти списки создаются заново на каждый вызов и принадлежат нам, поэтому
+    если накопленный ещё пуст — просто забираем produced без копирования.
+    """
+    if not current:
+        return produced
+    current += produced
+    return current
 
 
 class Repo2PipeCore:
     def __init__(self, repo_branch="main"):
+        # GitPython импортируется только при создании ядра, а не при импорте модуля
+        from .services.git_module import GitRepo2Pipe
+
         self.git = GitRepo2Pipe(default_branch=repo_branch)
         self.pipe_builder = None
         self.renders = None
@@ -19,9 +79,23 @@ class Repo2PipeCore:
         self.ci_templates: dict[str, str] = {}
         self.pipeline_summary = None
 
-    async def create_pipline(self, repository:str, branch:str, pipeline_type:str):
+    @staticmethod
+    def clear_render_cache() -> None:
+        """
+        Сбрасывает кэш отрендеренных CI-шаблонов.
+        """
+        _render_cache.clear()
+
+    async def _build_pipeline(self, repository: str, branch: str) -> tuple[StackInfo, Pipeline, PipelineSummary]:
+        """
+        Общая часть генерации: клонирование -> анализ стека -> абстрактный пайплайн.
+        Логи и предупреждения копятся в self.logs / self.warnings.
+
+        :raises GitExceptions: если репозиторий не удалось получить.
+        """
+        cloned: LocalRepo | None = None
         try:
-            cloned:LocalRepo = await run_animation(
+            cloned = await run_animation(
                 self.git.clone,
                 repository,
                 branch,
@@ -31,44 +105,18 @@ class Repo2PipeCore:
             stack, analysis_logs, analysis_warnings = analyzer.analyze_stack(cloned.repo_path)
             # click.echo(analysis_logs)
             # click.echo(analysis_warnings, err=True, color=True)
-            self.logs.extend(analysis_logs)
-            self.warnings.extend(analysis_warnings)
+            self.logs = _adopt(self.logs, analysis_logs)
+            self.warnings = _adopt(self.warnings, analysis_warnings)
+            self.stack = stack
 
             # 3) Строим абстрактный пайплайн
             pipeline, pipeline_logs, pipeline_warnings = builder.build_pipeline(stack)
             # click.echo(pipeline_logs)
-            self.logs.extend(pipeline_logs)
-            self.warnings.extend(pipeline_warnings)
+            self.logs = _adopt(self.logs, pipeline_logs)
+            self.warnings = _adopt(self.warnings, pipeline_warnings)
 
             # 3.1) Строим краткое резюме пайплайна
-            pipeline_summary = builder.summarize_pipeline(pipeline)
-
-            # 4) Рендерим CI-шаблоны
-            if "gitlab" == pipeline_type:
-                self.ci_templates["gitlab"] = gitlab_render.render(pipeline)
-            if "jenkins" == pipeline_type:
-                self.ci_templates["jenkins"] = jenkins_render.render(pipeline)
-
-            if not self.ci_templates:
-                self.warnings.append(
-                    "ci_systems пустой — шаблоны CI не сгенерированы. "
-                    "Укажите хотя бы 'gitlab' или 'jenkins'."
-            )
-
-        except GitExceptions as e:
-            self.logs.extend(e.logs)
-            self.warnings.append(
-                "Не удалось клонировать репозиторий. Проверьте URL/ветку и доступы."
-            )
-            self.warnings.append("Анализ стека и генерация пайплайна не выполнены.")
-            return AnalyzeResponse(
-                status="error",
-                stack=stack,
-                ci_templates=self.ci_templates,
-                warnings=self.warnings,
-                logs=self.logs,
-                pipeline_summary=None,
-            )
+            self.pipeline_summary = builder.summarize_pipeline(pipeline)
         finally:
             if cloned is not None:
                 try:
@@ -79,11 +127,91 @@ class Repo2PipeCore:
                         "Не удалось удалить временную папку с репозиторием (см. логи сервера)."
                     )
 
+        return stack, pipeline, self.pipeline_summary
+
+    def _on_git_error(self, e: GitExceptions) -> None:
+        self.logs.extend(e.logs)
+        self.warnings.append(str(e))
+        self.warnings.append(
+            "Не удалось клонировать репозиторий. Проверьте URL/ветку и доступы."
+        )
+        self.warnings.append("Анализ стека и генерация пайплайна не выполнены.")
+
+    def _add_default_warning(self) -> None:
         if not self.warnings:
             self.warnings.append(
                 "Шаблоны CI сгенерированы автоматически. Проверьте команды сборки/тестов/деплоя и адаптируйте под ваш проект."
             )
 
+    async def create_pipline(
+        self,
+        repository: str,
+        branch: str,
+        pipeline_type: str,
+    ) -> tuple[str | None, PipelineSummary | None, list[str], list[str]]:
+        """
+        Генерирует CI-шаблон одного типа (gitlab / jenkins).
+
+        Возвращает (template, pipeline_summary, warnings, logs);
+        при ошибке получения репозитория template и pipeline_summary — None.
+
+        :raises ValueError: если pipeline_type не поддерживается (до клонирования).
+        """
+        if pipeline_type not in RENDERERS:
+            raise ValueError(
+                f"Unsupported CI type: {pipeline_type}. "
+                f"Supported: {', '.join(RENDERERS)}"
+            )
+
+        try:
+            _, pipeline, pipeline_summary = await self._build_pipeline(repository, branch)
+        except GitExceptions as e:
+            self._on_git_error(e)
+            return None, None, self.warnings, self.logs
+
+        # 4) Рендерим только запрошенный CI-шаблон (один раз за запуск — без кэша)
+        template = RENDERERS[pipeline_type](pipeline)
+        self._add_default_warning()
+        return template, pipeline_summary, self.warnings, self.logs
+
+    async def create_pipelines(
+        self,
+        repository: str,
+        branch: str,
+        pipeline_types: list[str],
+    ) -> AnalyzeResponse:
+        """
+        Генерирует сразу несколько CI-шаблонов (для API и пакетных вызовов).
+        """
+        try:
+            stack, pipeline, pipeline_summary = await self._build_pipeline(repository, branch)
+        except GitExceptions as e:
+            self._on_git_error(e)
+            return AnalyzeResponse(
+                status="error",
+                stack=self.stack,
+                ci_templates=self.ci_templates,
+                warnings=self.warnings,
+                logs=self.logs,
+                pipeline_summary=None,
+            )
+
+        # 4) Рендерим CI-шаблоны; ключ кэша считаем один раз на пайплайн
+        pipeline_key: str | None = None
+        for pipeline_type in pipeline_types:
+            if pipeline_type in RENDERERS:
+                if pipeline_key is None:
+                    pipeline_key = _pipeline_key(pipeline)
+                self.ci_templates[pipeline_type] = _render_cached(pipeline_type, pipeline, pipeline_key)
+
+        if not self.ci_templates:
+            self.warnings.append(
+                "ci_systems пустой — шаблоны CI не сгенерированы. "
+                "Укажите хотя бы 'gitlab' или 'jenkins'."
+            )
+
+        self._add_default_warning()
+
         return AnalyzeResponse(
             status="ok",
             stack=stack,
@@ -1,10 +1,21 @@
-from typing import List
+from contextlib import contextmanager
+from typing import Iterator, List
 
 from model import Pipeline
 
 import click
 
 
+# Экранирование для команд в двойных кавычках (YAML + shell), один проход translate
+_SCRIPT_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"'})
+
+_HEADER_LINES = (
+    "# Autogenerated by Self-Deploy (hackathon)",
+    "#",
+    "# ========= Pipeline summary =========",
+)
+
+
 def render(pipeline: Pipeline) -> str:
     """
     Генерация .gitlab-ci.yml из нашей модели Pipeline.
@@ -16,17 +27,34 @@ def render(pipeline: Pipeline) -> str:
         перед ними добавляем echo с названием задачи.
       - В начале файла добавляем человекочитаемую сводку в виде комментариев.
     """
+    with progress(pipeline):
+        template = render_text(pipeline)
+    return template
+
 
+@contextmanager
+def progress(pipeline: Pipeline) -> Iterator[None]:
+    """
+    Печатает прогресс рендера вокруг построения текста.
+    Отделён от render_text, чтобы вывод не зависел от того, взят ли шаблон из кэша.
+    """
     click.echo("Генерация для GitLab CI/CD...")
+    for job in pipeline.jobs:
+        click.echo(f"Рендерим задачу {job.name}...")
+    yield
+    click.echo("Генерация завершена!")
+
 
+def render_text(pipeline: Pipeline) -> str:
+    """
+    Текст .gitlab-ci.yml без вывода в консоль — чистая функция от pipeline.
+    """
     lines: List[str] = []
 
     # ===== Человекочитаемая шапка =====
     job_names = [job.name for job in pipeline.jobs]
     stages = pipeline.stages or []
-    lines.append("# Autogenerated by Self-Deploy (hackathon)")
-    lines.append("#")
-    lines.append("# ========= Pipeline summary =========")
+    lines.extend(_HEADER_LINES)
     if stages:
         lines.append(f"# Stages ({len(stages)}): {', '.join(stages)}")
     else:
@@ -47,8 +75,6 @@ def render(pipeline: Pipeline) -> str:
     lines.append("")
 
     for job in pipeline.jobs:
-        click.echo(f"Рендерим задачу {job.name}...")
-
         # На всякий случай убираем пробелы из имени джобы
         job_name = job.name.replace(" ", "_")
 
@@ -70,10 +96,8 @@ def render(pipeline: Pipeline) -> str:
         lines.append("  script:")
         for cmd in commands:
             # немного экранирования, чтобы YAML и шелл не сломались
-            safe_cmd = cmd.replace("\\", "\\\\").replace('"', '\\"')
+            safe_cmd = cmd.translate(_SCRIPT_ESCAPES)
             lines.append(f'    - "{safe_cmd}"')
         lines.append("")
 
-    click.echo("Генерация завершена!")
-
     return "\n".join(lines)
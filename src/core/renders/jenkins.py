@@ -1,9 +1,33 @@
-from typing import Dict, List
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
 
 from model import Pipeline, Job
 import click
 
 
+# Экранирование для sh "..." в Groovy, один проход translate
+_SCRIPT_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"'})
+
+_HEADER_LINES = (
+    "// Autogenerated by Self-Deploy (hackathon)",
+    "//",
+    "// ========= Pipeline summary =========",
+)
+
+_PIPELINE_OPEN_LINES = (
+    "pipeline {",
+    # Общий agent отключаем, дальше будут агенты на уровне стадий
+    "    agent none",
+    "    stages {",
+)
+
+_PIPELINE_CLOSE_LINES = (
+    "    }",
+    "}",
+    "",
+)
+
+
 def render(pipeline: Pipeline) -> str:
     """
     Генерация declarative Jenkinsfile из абстрактного Pipeline.
@@ -17,12 +41,31 @@ def render(pipeline: Pipeline) -> str:
         agent { docker { image '...' } }, иначе agent any.
       - В начале файла добавляем человекочитаемую сводку в комментариях.
     """
+    with progress(pipeline):
+        template = render_text(pipeline)
+    return template
+
+
+@contextmanager
+def progress(pipeline: Pipeline) -> Iterator[None]:
+    """
+    Печатает прогресс рендера вокруг построения текста.
+    Отделён от render_text, чтобы вывод не зависел от того, взят ли шаблон из кэша.
+    """
     click.echo("Генерация для Jenkins...")
+    for job in pipeline.jobs:
+        click.echo(f"Рендерим задачу {job.name}...")
+    yield
+    click.echo("Генерация Jenkinsfile завершена!")
 
+
+def render_text(pipeline: Pipeline) -> str:
+    """
+    Текст Jenkinsfile без вывода в консоль — чистая функция от pipeline.
+    """
     # Группируем задачи по стадии
     stage_jobs: Dict[str, List[Job]] = {}
     for job in pipeline.jobs:
-        click.echo(f"Рендерим задачу {job.name}...")
         stage_jobs.setdefault(job.stage, []).append(job)
 
     lines: List[str] = []
@@ -30,9 +73,7 @@ def render(pipeline: Pipeline) -> str:
     # ===== Человекочитаемая шапка =====
     job_names = [job.name for job in pipeline.jobs]
     stages = pipeline.stages or []
-    lines.append("// Autogenerated by Self-Deploy (hackathon)")
-    lines.append("//")
-    lines.append("// ========= Pipeline summary =========")
+    lines.extend(_HEADER_LINES)
     if stages:
         lines.append(f"// Stages ({len(stages)}): {', '.join(stages)}")
     else:
@@ -46,10 +87,7 @@ def render(pipeline: Pipeline) -> str:
     lines.append("// ====================================")
 
     # ===== Оригинальный Jenkinsfile =====
-    lines.append("pipeline {")
-    # Общий agent отключаем, дальше будут агенты на уровне стадий
-    lines.append("    agent none")
-    lines.append("    stages {")
+    lines.extend(_PIPELINE_OPEN_LINES)
 
     for stage_name in pipeline.stages:
         jobs = stage_jobs.get(stage_name)
@@ -81,15 +119,11 @@ def render(pipeline: Pipeline) -> str:
             lines.append(f"                echo 'Job: {job.name}'")
             # Команды job.script
             for cmd in (job.script or []):
-                safe_cmd = cmd.replace("\\", "\\\\").replace('"', '\\"')
+                safe_cmd = cmd.translate(_SCRIPT_ESCAPES)
                 lines.append(f'                sh "{safe_cmd}"')
         lines.append("            }")
         lines.append("        }")
 
-    lines.append("    }")
-    lines.append("}")
-    lines.append("")
-
-    click.echo("Генерация Jenkinsfile завершена!")
+    lines.extend(_PIPELINE_CLOSE_LINES)
 
     return "\n".join(lines)
@@ -2,16 +2,29 @@ from __future__ import annotations
 
 import click
 import json
+import mmap
 import os
 import re
+import xml.etree.ElementTree as ET
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Iterable, Tuple, List, Dict
+from typing import Any, Callable, Iterator, Tuple, List, Dict
 
 from core.models import StackInfo, DockerfileInfo
 
+try:
+    # Необязательная зависимость: быстрый C-парсер JSON
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # Директории, которые игнорируем при обходе репозитория
-IGNORED_DIRS = {
+IGNORED_DIRS: frozenset[str] = frozenset({
     ".git",
     ".hg",
     ".svn",
@@ -24,7 +37,7 @@ IGNORED_DIRS = {
     "target",
     ".idea",
     ".vscode",
-}
+})
 
 # Карта расширений в 4 основных языка кейса
 EXT_TO_LANGUAGE: Dict[str, str] = {
@@ -45,100 +58,164 @@ EXT_TO_LANGUAGE: Dict[str, str] = {
     ".go": "go",
 }
 
-
-def _iter_files(base_dir: Path) -> Iterable[Path]:
+# Имя файла (в нижнем регистре) -> группа ключевых конфигов
+_NAME_TO_BUCKET: Dict[str, str] = {
+    "requirements.txt": "requirements",
+    "pyproject.toml": "pyproject",
+    "pipfile": "pipfile",
+    "package.json": "package_json",
+    "pom.xml": "pom",
+    "build.gradle": "gradle",
+    "build.gradle.kts": "gradle",
+    "go.mod": "go_mod",
+    "tsconfig.json": "tsconfig",
+}
+# Все группы (ключи ScanResult.grouped), даже если файлов не нашлось
+_BUCKETS: Tuple[str, ...] = tuple(dict.fromkeys(_NAME_TO_BUCKET.values()))
+
+# Директории, yaml-файлы в которых считаем (очень грубо) k8s-манифестами
+_K8S_DIR_NAMES = frozenset({"k8s", "kubernetes", "manifests"})
+
+# Регулярки компилируем один раз на модуль
+# requirements.txt: name[extras] <op> version
+# (одна прекомпилированная регулярка на строку быстрее разбора через find/partition
+#  на Python-уровне, поэтому отдельного «быстрого пути» для name==version нет)
+_REQ_RE = re.compile(r"^([A-Za-z0-9_.\-]+)(?:\[[^\]]+\])?\s*([<>=!~]+)\s*([^\s]+)")
+# Dockerfile: FROM python:3.11-slim
+_DOCKER_PY_RE = re.compile(r"from\s+python:([\w.\-]+)", re.IGNORECASE)
+# build.gradle(.kts)
+_GRADLE_SRCCOMPAT_RE = re.compile(r"sourceCompatibility\s*=\s*['\"]([^'\"]+)['\"]")
+_GRADLE_DEP_RE = re.compile(
+    r"(?:implementation|api|compileOnly|runtimeOnly|testImplementation)\s+['\"]([^:'\"]+):([^:'\"]+):([^'\"\n]+)['\"]"
+)
+
+
+def _iter_files(base_dir: Path | str) -> Iterator[os.DirEntry]:
     """
     Обход файлов репозитория с пропуском служебных и тяжёлых директорий.
+
+    Работает поверх os.scandir и отдаёт DirEntry: имя и путь доступны как строки,
+    поэтому внутри анализатора пути файлов так и остаются str.
+    Порядок обхода как у os.walk: сначала файлы каталога, затем подкаталоги.
+    Симлинки на директории не раскрываются (как os.walk по умолчанию).
+    """
+    try:
+        it = os.scandir(base_dir)
+    except OSError:
+        return
+
+    subdirs: List[str] = []
+    with it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if not is_dir:
+                yield entry
+            elif entry.name not in IGNORED_DIRS and not entry.is_symlink():
+                subdirs.append(entry.path)
+
+    for subdir in subdirs:
+        yield from _iter_files(subdir)
+
+
+@dataclass
+class ScanResult:
+    """
+    Результат единственного обхода репозитория.
+
+    grouped          — ключевые конфиги по типам (requirements, pyproject, package_json, ...)
+    language_counts  — количество файлов на язык (по расширениям)
+    dockerfiles      — файлы Dockerfile* с учётом регистра (включая Dockerfile.api, Dockerfile-ui)
+    plain_dockerfiles — dockerfile / dockerfile.* в любом регистре (флаг и версия Python)
+    has_dockerfile / has_docker_compose / has_k8s — флаги deploy-артефактов
+    """
+    grouped: Dict[str, List[str]]
+    language_counts: Dict[str, int] = field(default_factory=dict)
+    dockerfiles: List[str] = field(default_factory=list)
+    plain_dockerfiles: List[str] = field(default_factory=list)
+    has_dockerfile: bool = False
+    has_docker_compose: bool = False
+    has_k8s: bool = False
+
+
+def _scan_repo(repo_path: Path) -> ScanResult:
+    """
+    Один проход по репозиторию, за который собираем всё, что нужно детекторам:
+    - ключевые конфиги:
+      - Python: requirements.txt, pyproject.toml, Pipfile
+      - Node: package.json (+ tsconfig.json)
+      - Java/Kotlin: pom.xml, build.gradle(.kts)
+      - Go: go.mod
+    - количество файлов по языкам;
+    - Dockerfile'ы, docker-compose и (очень грубо) k8s-манифесты.
+    """
+    scan = ScanResult(grouped={bucket: [] for bucket in _BUCKETS})
+    grouped = scan.grouped
+    language_counts: Counter[str] = Counter()
+
+    for entry in _iter_files(repo_path):
+        name = entry.name.lower()
+
+        bucket = _NAME_TO_BUCKET.get(name)
+        if bucket is not None:
+            grouped[bucket].append(entry.path)
+
+        lang = EXT_TO_LANGUAGE.get(os.path.splitext(name)[1])
+        if lang:
+            language_counts[lang] += 1
+
+        # Образы собираем только из Dockerfile* с учётом регистра (как раньше rglob),
+        # иначе dockerfile_notes.md или dockerfile_test.go стали бы docker-джобами
+        if entry.name.startswith("Dockerfile"):
+            scan.dockerfiles.append(entry.path)
+        if name == "dockerfile" or name.startswith("dockerfile."):
+            scan.plain_dockerfiles.append(entry.path)
+            scan.has_dockerfile = True
+        elif name in {"docker-compose.yml", "docker-compose.yaml"}:
+            scan.has_docker_compose = True
+        if name.endswith((".yml", ".yaml")) and not _K8S_DIR_NAMES.isdisjoint(
+            entry.path.split(os.sep)
+        ):
+            scan.has_k8s = True
+
+    scan.language_counts = dict(language_counts)
+    return scan
+
+
+def _detect_dockerfiles(repo_path: Path, dockerfile_paths: List[str]) -> List[DockerfileInfo]:
     """
-    for root, dirs, files in os.walk(base_dir):
-        dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
-        for filename in files:
-            yield Path(root) / filename
-
-
-def _group_project_files(repo_path: Path) -> Dict[str, List[Path]]:
-    """
-    Сканируем репозиторий и собираем списки ключевых конфигов:
-    - Python: requirements.txt, pyproject.toml, Pipfile
-    - Node: package.json (+ tsconfig.json)
-    - Java/Kotlin: pom.xml, build.gradle(.kts)
-    - Go: go.mod
-    """
-    req_files: List[Path] = []
-    pyproject_files: List[Path] = []
-    pipfile_files: List[Path] = []
-    package_json_files: List[Path] = []
-    pom_files: List[Path] = []
-    gradle_files: List[Path] = []
-    go_mod_files: List[Path] = []
-    tsconfig_files: List[Path] = []
-
-    for file_path in _iter_files(repo_path):
-        name = file_path.name.lower()
-        if name == "requirements.txt":
-            req_files.append(file_path)
-        elif name == "pyproject.toml":
-            pyproject_files.append(file_path)
-        elif name == "pipfile":
-            pipfile_files.append(file_path)
-        elif name == "package.json":
-            package_json_files.append(file_path)
-        elif name == "pom.xml":
-            pom_files.append(file_path)
-        elif name in ("build.gradle", "build.gradle.kts"):
-            gradle_files.append(file_path)
-        elif name == "go.mod":
-            go_mod_files.append(file_path)
-        elif name == "tsconfig.json":
-            tsconfig_files.append(file_path)
-
-    return {
-        "requirements": req_files,
-        "pyproject": pyproject_files,
-        "pipfile": pipfile_files,
-        "package_json": package_json_files,
-        "pom": pom_files,
-        "gradle": gradle_files,
-        "go_mod": go_mod_files,
-        "tsconfig": tsconfig_files,
-    }
-
-
-def _detect_dockerfiles(repo_path: Path) -> List[DockerfileInfo]:
-    """
-    Находит Dockerfile'ы в репозитории и строит по ним DockerfileInfo.
+    Строит DockerfileInfo по Dockerfile'ам, найденным в _scan_repo
+    (служебные директории из IGNORED_DIRS там уже отброшены).
     Простая эвристика:
       - Dockerfile в корне => context=".", name="app"
       - Dockerfile в подпапке (services/api/Dockerfile) => context="services/api", name="api"
       - Dockerfile.* => name из суффикса (Dockerfile.ui -> ui)
     """
     dockerfiles: List[DockerfileInfo] = []
+    # Все пути из скана начинаются с repo_path — относительный путь берём срезом строки
+    prefix_len = len(os.path.join(str(repo_path), ""))
 
-    for p in repo_path.rglob("Dockerfile*"):
-        # пропустим .git и прочее мусорное
-        if ".git" in p.parts:
-            continue
-
-        rel = p.relative_to(repo_path)
+    for p in dockerfile_paths:
+        rel = p[prefix_len:]
+        rel_parent, _, file_name = rel.rpartition(os.sep)
 
         # Определяем context (директория с Dockerfile)
-        context_path = rel.parent
-        context_str = str(context_path) if str(context_path) != "." else "."
+        context_str = rel_parent or "."
+        context_name = rel_parent.rpartition(os.sep)[2]
 
         # Определяем логическое имя
-        if p.name == "Dockerfile":
-            name = context_path.name or "app"
+        if file_name.lower() == "dockerfile":
+            name = context_name or "app"
         else:
             # Dockerfile.api -> api, Dockerfile-ui -> ui
-            base = p.name
-            if base.startswith("Dockerfile"):
-                base = base[len("Dockerfile"):]
-            base = base.lstrip("._-")
-            name = base or context_path.name or "app"
+            base = file_name[len("Dockerfile"):].lstrip("._-")
+            name = base or context_name or "app"
 
         dockerfiles.append(
             DockerfileInfo(
-                path=str(rel),
+                path=rel,
                 context=context_str,
                 name=name,
             )
@@ -146,18 +223,13 @@ def _detect_dockerfiles(repo_path: Path) -> List[DockerfileInfo]:
 
     return dockerfiles
 
-def _detect_languages(repo_path: Path, logs: List[str]) -> Tuple[List[str], Dict[str, int]]:
+def _detect_languages(scan: ScanResult, logs: List[str]) -> Tuple[List[str], Dict[str, int]]:
     """
-    Определяем языки по расширениям файлов + считаем количество файлов на язык.
+    Определяем языки по расширениям файлов; количество файлов на язык
+    уже посчитано в _scan_repo.
     """
     click.echo("Определяем языки проекта...")
-    language_counts: Dict[str, int] = {}
-
-    for file_path in _iter_files(repo_path):
-        lang = EXT_TO_LANGUAGE.get(file_path.suffix.lower())
-        if not lang:
-            continue
-        language_counts[lang] = language_counts.get(lang, 0) + 1
+    language_counts = scan.language_counts
 
     langs = sorted(language_counts.keys())
     logs.append(f"Определены языки проекта: {langs or 'не обнаружены'} (counts={language_counts})")
@@ -165,13 +237,101 @@ def _detect_languages(repo_path: Path, logs: List[str]) -> Tuple[List[str], Dict
     return langs, language_counts
 
 
-def _detect_package_managers(repo_path: Path, logs: List[str]) -> List[str]:
+@lru_cache(maxsize=512)
+def _read_bytes_cached(path_str: str, mtime_ns: int, size: int) -> bytes | None:
+    """
+    Читает файл целиком как bytes. mtime_ns/size входят в ключ кэша: один и тот же
+    конфиг (requirements/pyproject/pom/gradle) читают и детект фреймворков, и
+    сборщики версий — с диска он берётся один раз.
+    Кэш живёт в пределах одного analyze_stack: пути указывают во временный клон,
+    который удаляется после анализа, поэтому в конце анализа кэш сбрасывается.
+    """
+    try:
+        with open(path_str, "rb") as fh:
+            return fh.read()
+    except OSError:
+        return None
+
+
+def _file_key(path: str) -> Tuple[str, int, int] | None:
+    """
+    Ключ кэша чтения: (путь, mtime_ns, size), или None, если файл недоступен.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return path, st.st_mtime_ns, st.st_size
+
+
+def _read_bytes(path: str) -> bytes | None:
+    """
+    Содержимое файла как bytes (или None, если файл не читается).
+    """
+    key = _file_key(path)
+    return None if key is None else _read_bytes_cached(*key)
+
+
+def _read_text(path: str) -> str | None:
+    """
+    Содержимое файла как str (или None, если файл не читается).
+    Декодируется из закэшированных байтов — второй копии в кэше не держим.
+    """
+    raw = _read_bytes(path)
+    return None if raw is None else raw.decode("utf-8", errors="ignore")
+
+
+@lru_cache(maxsize=256)
+def _parse_json_cached(path_str: str, mtime_ns: int, size: int) -> Dict[str, Any] | None:
+    """
+    Разбирает JSON-файл. mtime_ns/size входят в ключ кэша: если файл изменился,
+    он будет разобран заново. Кэш живёт в пределах одного analyze_stack.
+    """
+    try:
+        with open(path_str, "rb") as fh:
+            raw = fh.read()
+    except OSError:
+        return None
+
+    data = None
+    if orjson is not None:
+        try:
+            data = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            data = None
+    if data is None:
+        try:
+            data = json.loads(raw.decode("utf-8", errors="ignore"))
+        except ValueError:
+            return None
+
+    return data if isinstance(data, dict) else None
+
+
+def _load_package_json(path: str) -> Dict[str, Any] | None:
+    """
+    Содержимое package.json (или None, если файл не читается/не разбирается).
+    Повторные обращения к тому же неизменённому файлу берутся из кэша.
+    """
+    key = _file_key(path)
+    return None if key is None else _parse_json_cached(*key)
+
+
+def _clear_file_caches() -> None:
+    """
+    Сбрасывает кэши чтения и разбора файлов после анализа одного репозитория:
+    ключи указывают во временный клон, который удаляется после анализа.
+    """
+    _read_bytes_cached.cache_clear()
+    _parse_json_cached.cache_clear()
+
+
+def _detect_package_managers(grouped: Dict[str, List[str]], logs: List[str]) -> List[str]:
     """
     Определяем менеджеры пакетов по наличию конфигов во всём репозитории.
     """
     click.echo("Определяем менеджеры пакетов...")
     pm: set[str] = set()
-    grouped = _group_project_files(repo_path)
 
     # Python
     if grouped["requirements"]:
@@ -184,12 +344,12 @@ def _detect_package_managers(repo_path: Path, logs: List[str]) -> List[str]:
     # Node.js
     if grouped["package_json"]:
         for pkg in grouped["package_json"]:
-            parent = pkg.parent
-            if (parent / "yarn.lock").exists():
+            parent = os.path.dirname(pkg)
+            if os.path.exists(os.path.join(parent, "yarn.lock")):
                 pm.add("yarn")
-            elif (parent / "pnpm-lock.yaml").exists():
+            elif os.path.exists(os.path.join(parent, "pnpm-lock.yaml")):
                 pm.add("pnpm")
-            elif (parent / "package-lock.json").exists():
+            elif os.path.exists(os.path.join(parent, "package-lock.json")):
                 pm.add("npm")
             else:
                 pm.add("npm")
@@ -210,8 +370,32 @@ def _detect_package_managers(repo_path: Path, logs: List[str]) -> List[str]:
     return managers
 
 
+# Python-фреймворки: ключевое слово в requirements/pyproject -> фреймворк
+_PY_FW_KEYWORDS: Tuple[Tuple[bytes, str], ...] = (
+    (b"fastapi", "fastapi"),
+    (b"flask", "flask"),
+    (b"django", "django"),
+)
+# Node-фреймворки: точное имя пакета -> фреймворк и префикс имени -> фреймворк
+_NODE_FW_BY_NAME: Dict[str, str] = {
+    "vue": "vue",
+    "react": "react",
+    "@angular/core": "angular",
+    "express": "express",
+    "nestjs": "nestjs",
+    "@nestjs/core": "nestjs",
+}
+_NODE_FW_PREFIXES: Tuple[Tuple[str, str], ...] = (
+    ("@vue/", "vue"),
+    ("react-", "react"),
+)
+# Полные наборы фреймворков по экосистемам: когда найдены все, дальше не ищем
+_PY_FRAMEWORKS = frozenset(fw for _, fw in _PY_FW_KEYWORDS)
+_NODE_FRAMEWORKS = frozenset(_NODE_FW_BY_NAME.values())
+
+
 def _detect_frameworks(
-    repo_path: Path,
+    grouped: Dict[str, List[str]],
     languages: List[str],
     logs: List[str],
 ) -> List[str]:
@@ -220,61 +404,56 @@ def _detect_frameworks(
     """
     click.echo("Грубый детект фреймворков...")
     frameworks: set[str] = set()
-    grouped = _group_project_files(repo_path)
 
     # --- Python: fastapi / flask / django ---
     python_files = grouped["requirements"] + grouped["pyproject"]
     for f in python_files:
-        try:
-            content = f.read_text(encoding="utf-8", errors="ignore").lower()
-        except Exception:
+        # ключевые слова ASCII — ищем по bytes без декодирования в str
+        content = _read_bytes(f)
+        if content is None:
             continue
+        content = content.lower()
 
-        if "fastapi" in content:
-            frameworks.add("fastapi")
-        if "flask" in content:
-            frameworks.add("flask")
-        if "django" in content:
-            frameworks.add("django")
+        # уже найденные фреймворки в следующих файлах не ищем
+        for keyword, fw_name in _PY_FW_KEYWORDS:
+            if fw_name not in frameworks and keyword in content:
+                frameworks.add(fw_name)
+        if _PY_FRAMEWORKS <= frameworks:
+            # все Python-фреймворки уже найдены — остальные файлы не читаем
+            break
 
     # --- Node.js: vue / react / angular / express / nestjs ---
     for pkg in grouped["package_json"]:
-        try:
-            data = json.loads(pkg.read_text(encoding="utf-8", errors="ignore"))
-        except Exception:
+        data = _load_package_json(pkg)
+        if data is None:
             continue
 
         deps = data.get("dependencies", {}) or {}
         dev_deps = data.get("devDependencies", {}) or {}
-        all_names = {name.lower() for name in {**deps, **dev_deps}.keys()}
-
-        if "vue" in all_names or any(name.startswith("@vue/") for name in all_names):
-            frameworks.add("vue")
-        if "react" in all_names or any(name.startswith("react-") for name in all_names):
-            frameworks.add("react")
-        if "@angular/core" in all_names:
-            frameworks.add("angular")
-        if "express" in all_names:
-            frameworks.add("express")
-        if "nestjs" in all_names or "@nestjs/core" in all_names:
-            frameworks.add("nestjs")
-
-    # --- Java/Kotlin: spring ---
-    for pom in grouped["pom"]:
-        try:
-            content = pom.read_text(encoding="utf-8", errors="ignore").lower()
-        except Exception:
-            continue
-        if "spring-boot-starter" in content or "org.springframework" in content:
-            frameworks.add("spring")
 
-    for gf in grouped["gradle"]:
-        try:
-            content = gf.read_text(encoding="utf-8", errors="ignore").lower()
-        except Exception:
+        # Один проход по именам пакетов вместо отдельного any(...) на каждый фреймворк
+        for name in chain(deps, dev_deps):
+            name = name.lower()
+            fw_name = _NODE_FW_BY_NAME.get(name)
+            if fw_name is None:
+                fw_name = next(
+                    (fw for prefix, fw in _NODE_FW_PREFIXES if name.startswith(prefix)),
+                    None,
+                )
+            if fw_name is not None:
+                frameworks.add(fw_name)
+        if _NODE_FRAMEWORKS <= frameworks:
+            break
+
+    # --- Java/Kotlin: spring (до первого найденного) ---
+    for jf in chain(grouped["pom"], grouped["gradle"]):
+        content = _read_bytes(jf)
+        if content is None:
             continue
-        if "spring-boot-starter" in content or "org.springframework" in content:
+        content = content.lower()
+        if b"spring-boot-starter" in content or b"org.springframework" in content:
             frameworks.add("spring")
+            break
 
     fw = sorted(frameworks)
     logs.append(f"Обнаружены фреймворки: {fw or 'не обнаружены'}")
@@ -284,15 +463,15 @@ def _detect_frameworks(
 
 # ---------- Python: зависимости и версия ----------
 
-def _parse_python_requirements_file(path: Path) -> Dict[str, str]:
+def _parse_python_requirements_file(path: str) -> Dict[str, str]:
     """
     Примитивный разбор requirements.txt → {package: version} по строгим ограничениям (==).
     """
     deps: Dict[str, str] = {}
-    try:
-        lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
-    except Exception:
+    content = _read_text(path)
+    if content is None:
         return deps
+    lines = content.splitlines()
 
     for line in lines:
         line = line.strip()
@@ -301,10 +480,7 @@ def _parse_python_requirements_file(path: Path) -> Dict[str, str]:
         if ";" in line:
             line = line.split(";", 1)[0].strip()
 
-        m = re.match(
-            r"^([A-Za-z0-9_.\-]+)(?:\[[^\]]+\])?\s*([<>=!~]+)\s*([^\s]+)",
-            line,
-        )
+        m = _REQ_RE.match(line)
         if not m:
             continue
         name, op, ver = m.group(1), m.group(2), m.group(3)
@@ -314,12 +490,16 @@ def _parse_python_requirements_file(path: Path) -> Dict[str, str]:
     return deps
 
 
-def _detect_python_version(repo_path: Path) -> str | None:
+def _detect_python_version(
+    repo_path: Path,
+    pyproject_files: List[str],
+    dockerfile_paths: List[str],
+) -> str | None:
     """
     Пытаемся найти версию Python:
     - .python-version
     - pyproject.toml (requires-python / python = "^3.11")
-    - Dockerfile (образ python:3.11-...)
+    - Dockerfile / Dockerfile.* (образ python:3.11-...) — из списка, уже собранного _scan_repo
     """
     pyver_file = repo_path / ".python-version"
     if pyver_file.exists():
@@ -330,13 +510,11 @@ def _detect_python_version(repo_path: Path) -> str | None:
         except Exception:
             pass
 
-    grouped = _group_project_files(repo_path)
-
-    for f in grouped["pyproject"]:
-        try:
-            lines = f.read_text(encoding="utf-8", errors="ignore").splitlines()
-        except Exception:
+    for f in pyproject_files:
+        content = _read_text(f)
+        if content is None:
             continue
+        lines = content.splitlines()
 
         for line in lines:
             s = line.strip()
@@ -347,26 +525,25 @@ def _detect_python_version(repo_path: Path) -> str | None:
                 rhs = s.split("=", 1)[1].strip().strip("\"'")
                 return rhs
 
-    for file_path in _iter_files(repo_path):
-        name = file_path.name.lower()
-        if name != "dockerfile" and not name.startswith("dockerfile."):
+    for df in dockerfile_paths:
+        content = _read_text(df)
+        if content is None:
             continue
-        try:
-            content = file_path.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
-            continue
-        m = re.search(r"from\s+python:([\w.\-]+)", content, re.IGNORECASE)
+        m = _DOCKER_PY_RE.search(content)
         if m:
             return m.group(1).strip()
 
     return None
 
 
-def _collect_python(repo_path: Path) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str], Dict[str, str]]:
+def _collect_python(
+    repo_path: Path,
+    scan: ScanResult,
+) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str], Dict[str, str]]:
     """
     Собираем Python-зависимости и версию Python/фреймворков.
     """
-    grouped = _group_project_files(repo_path)
+    grouped = scan.grouped
 
     dependencies: Dict[str, Dict[str, str]] = {}
     language_versions: Dict[str, str] = {}
@@ -381,7 +558,7 @@ def _collect_python(repo_path: Path) -> Tuple[Dict[str, Dict[str, str]], Dict[st
     if py_deps:
         dependencies["python"] = py_deps
 
-    pyver = _detect_python_version(repo_path)
+    pyver = _detect_python_version(repo_path, grouped["pyproject"], scan.plain_dockerfiles)
     if pyver:
         language_versions["python"] = pyver
 
@@ -396,11 +573,14 @@ def _collect_python(repo_path: Path) -> Tuple[Dict[str, Dict[str, str]], Dict[st
 
 # ---------- Node/JS/TS ----------
 
-def _collect_node(repo_path: Path) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str], Dict[str, str]]:
+def _collect_node(
+    repo_path: Path,
+    scan: ScanResult,
+) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str], Dict[str, str]]:
     """
     Собираем зависимости Node/JS/TS и версию Node из package.json.
     """
-    grouped = _group_project_files(repo_path)
+    grouped = scan.grouped
 
     dependencies: Dict[str, Dict[str, str]] = {}
     language_versions: Dict[str, str] = {}
@@ -409,9 +589,8 @@ def _collect_node(repo_path: Path) -> Tuple[Dict[str, Dict[str, str]], Dict[str,
     node_deps: Dict[str, str] = {}
 
     for pkg in grouped["package_json"]:
-        try:
-            data = json.loads(pkg.read_text(encoding="utf-8", errors="ignore"))
-        except Exception:
+        data = _load_package_json(pkg)
+        if data is None:
             continue
 
         for section in ("dependencies", "devDependencies"):
@@ -446,11 +625,14 @@ def _collect_node(repo_path: Path) -> Tuple[Dict[str, Dict[str, str]], Dict[str,
 
 # ---------- Go ----------
 
-def _collect_go(repo_path: Path) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str], Dict[str, str]]:
+def _collect_go(
+    repo_path: Path,
+    scan: ScanResult,
+) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str], Dict[str, str]]:
     """
     Собираем зависимости и версию Go из go.mod.
     """
-    grouped = _group_project_files(repo_path)
+    grouped = scan.grouped
 
     dependencies: Dict[str, Dict[str, str]] = {}
     language_versions: Dict[str, str] = {}
@@ -463,10 +645,10 @@ def _collect_go(repo_path: Path) -> Tuple[Dict[str, Dict[str, str]], Dict[str, s
     go_deps: Dict[str, str] = {}
 
     for gm in go_mod_files:
-        try:
-            lines = gm.read_text(encoding="utf-8", errors="ignore").splitlines()
-        except Exception:
+        content = _read_text(gm)
+        if content is None:
             continue
+        lines = content.splitlines()
 
         in_block = False
         for line in lines:
@@ -516,12 +698,117 @@ def _collect_go(repo_path: Path) -> Tuple[Dict[str, Dict[str, str]], Dict[str, s
 
 # ---------- Java / Kotlin ----------
 
-def _collect_java_kotlin(repo_path: Path) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str], Dict[str, str]]:
+# Размер порции, которой pom.xml скармливается потоковому XML-парсеру
+_POM_FEED_CHUNK = 64 * 1024
+# pom.xml больше этого размера не читаем целиком, а отображаем в память (mmap)
+_POM_MMAP_THRESHOLD = 1024 * 1024
+
+# Запасной разбор pom.xml регулярками, если XML некорректен (байтовые — работают и по mmap)
+_POM_COMPILER_SOURCE_RE = re.compile(
+    rb"<maven\.compiler\.source>\s*([^<]+)</maven\.compiler\.source>"
+)
+_POM_DEP_RE = re.compile(
+    rb"<dependency>\s*"
+    rb"<groupId>\s*([^<]+)</groupId>\s*"
+    rb"<artifactId>\s*([^<]+)</artifactId>\s*"
+    rb"(?:<version>\s*([^<]+)</version>)?",
+    re.DOTALL,
+)
+
+
+def _xml_local_name(tag: str) -> str:
+    """
+    Имя тега без пространства имён: '{http://maven.apache.org/POM/4.0.0}groupId' -> 'groupId'.
+    """
+    return tag.rpartition("}")[2]
+
+
+def _parse_pom(content: bytes | mmap.mmap) -> Tuple[str | None, List[Tuple[str, str, str]]]:
+    """
+    Потоково разбирает pom.xml: возвращает maven.compiler.source (или None)
+    и список зависимостей (groupId, artifactId, version).
+    Парсер получает сырые байты: кодировку берёт из XML-декларации сам.
+
+    :raises ET.ParseError: если pom.xml не является корректным XML.
+    """
+    compiler_source: str | None = None
+    deps: List[Tuple[str, str, str]] = []
+
+    parser = ET.XMLPullParser(events=("end",))
+    for start in range(0, len(content), _POM_FEED_CHUNK):
+        parser.feed(content[start:start + _POM_FEED_CHUNK])
+        for _, elem in parser.read_events():
+            name = _xml_local_name(elem.tag)
+            if name == "dependency":
+                fields = {_xml_local_name(child.tag): (child.text or "").strip() for child in elem}
+                group_id = fields.get("groupId")
+                artifact_id = fields.get("artifactId")
+                if group_id and artifact_id:
+                    deps.append((group_id, artifact_id, fields.get("version", "")))
+                elem.clear()
+            elif name == "maven.compiler.source" and compiler_source is None:
+                compiler_source = (elem.text or "").strip() or None
+    parser.close()
+
+    return compiler_source, deps
+
+
+def _parse_pom_regex(content: bytes | mmap.mmap) -> Tuple[str | None, List[Tuple[str, str, str]]]:
+    """
+    Запасной разбор pom.xml регулярками — для файлов, которые XML-парсер не принимает
+    (пустая строка перед <?xml?>, HTML-сущности вроде &nbsp;, "--" в комментарии).
+    """
+    def _text(raw: bytes | None) -> str:
+        return (raw or b"").decode("utf-8", errors="ignore").strip()
+
+    m = _POM_COMPILER_SOURCE_RE.search(content)
+    compiler_source = _text(m.group(1)) if m else None
+
+    deps: List[Tuple[str, str, str]] = []
+    for dep_match in _POM_DEP_RE.finditer(content):
+        deps.append((_text(dep_match.group(1)), _text(dep_match.group(2)), _text(dep_match.group(3))))
+
+    return compiler_source, deps
+
+
+def _parse_pom_file(path: str) -> Tuple[str | None, List[Tuple[str, str, str]]]:
+    """
+    Разбирает pom.xml с диска. Обычные файлы берутся из кэша чтения,
+    большие (> _POM_MMAP_THRESHOLD) — через mmap, без копии всего файла в память.
+    Некорректный XML не отбрасывается, а разбирается регулярками (_parse_pom_regex).
+
+    :raises OSError: если файл не читается.
+    """
+    key = _file_key(path)
+    if key is None:
+        raise OSError(f"Не удалось прочитать {path}")
+
+    size = key[2]
+    if size > _POM_MMAP_THRESHOLD:
+        with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            try:
+                return _parse_pom(buf)
+            except ET.ParseError:
+                return _parse_pom_regex(buf)
+
+    content = _read_bytes_cached(*key)
+    if content is None:
+        raise OSError(f"Не удалось прочитать {path}")
+    try:
+        return _parse_pom(content)
+    except ET.ParseError:
+        return _parse_pom_regex(content)
+
+
+def _collect_java_kotlin(
+    repo_path: Path,
+    scan: ScanResult,
+) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str], Dict[str, str]]:
     """
     Собираем зависимости Java/Kotlin из pom.xml и build.gradle(.kts),
     версию Java/Kotlin и версии популярных фреймворков (spring, junit, ktor).
     """
-    grouped = _group_project_files(repo_path)
+    grouped = scan.grouped
 
     dependencies: Dict[str, Dict[str, str]] = {}
     language_versions: Dict[str, str] = {}
@@ -532,29 +819,14 @@ def _collect_java_kotlin(repo_path: Path) -> Tuple[Dict[str, Dict[str, str]], Di
     # pom.xml
     for pom in grouped["pom"]:
         try:
-            content = pom.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
+            compiler_source, pom_deps = _parse_pom_file(pom)
+        except OSError:
             continue
 
-        m = re.search(
-            r"<maven\.compiler\.source>\s*([^<]+)</maven\.compiler\.source>",
-            content,
-        )
-        if m and "java" not in language_versions:
-            language_versions["java"] = m.group(1).strip()
-
-        for dep_match in re.finditer(
-            r"<dependency>\s*"
-            r"<groupId>\s*([^<]+)</groupId>\s*"
-            r"<artifactId>\s*([^<]+)</artifactId>\s*"
-            r"(?:<version>\s*([^<]+)</version>)?",
-            content,
-            re.DOTALL,
-        ):
-            group_id = dep_match.group(1).strip()
-            artifact_id = dep_match.group(2).strip()
-            version = (dep_match.group(3) or "").strip()
+        if compiler_source and "java" not in language_versions:
+            language_versions["java"] = compiler_source
 
+        for group_id, artifact_id, version in pom_deps:
             key = f"{group_id}:{artifact_id}"
             if key not in java_deps:
                 java_deps[key] = version
@@ -573,26 +845,27 @@ def _collect_java_kotlin(repo_path: Path) -> Tuple[Dict[str, Dict[str, str]], Di
 
     # build.gradle / build.gradle.kts
     for gf in grouped["gradle"]:
-        try:
-            content = gf.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
+        content = _read_text(gf)
+        if content is None:
             continue
 
-        m = re.search(
-            r"sourceCompatibility\s*=\s*['\"]([^'\"]+)['\"]",
-            content,
-        )
-        if m and "java" not in language_versions:
-            language_versions["java"] = m.group(1).strip()
-
-        for dep_match in re.finditer(
-            r"(?:implementation|api|compileOnly|runtimeOnly|testImplementation)\s+['\"]([^:'\"]+):([^:'\"]+):([^'\"\n]+)['\"]",
-            content,
-        ):
-            group_id = dep_match.group(1).strip()
-            artifact_id = dep_match.group(2).strip()
-            version = dep_match.group(3).strip()
-
+        # Построчный проход: регэкспы применяются к коротким строкам,
+        # а не ко всему (возможно многомегабайтному) файлу
+        gradle_deps: List[Tuple[str, str, str]] = []
+        for line in content.splitlines():
+            if "java" not in language_versions:
+                m = _GRADLE_SRCCOMPAT_RE.search(line)
+                if m:
+                    language_versions["java"] = m.group(1).strip()
+
+            for dep_match in _GRADLE_DEP_RE.finditer(line):
+                gradle_deps.append((
+                    dep_match.group(1).strip(),
+                    dep_match.group(2).strip(),
+                    dep_match.group(3).strip(),
+                ))
+
+        for group_id, artifact_id, version in gradle_deps:
             key = f"{group_id}:{artifact_id}"
             if key not in java_deps:
                 java_deps[key] = version
@@ -619,8 +892,47 @@ def _collect_java_kotlin(repo_path: Path) -> Tuple[Dict[str, Dict[str, str]], Di
     return dependencies, language_versions, framework_versions
 
 
+# Общий пул для сборщиков зависимостей: потоки создаются лениво и живут весь процесс,
+# а не поднимаются заново на каждый анализ. Отдельный от default executor из cli,
+# чтобы не ждать собственных задач в ограниченном пуле.
+_COLLECTOR_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="collector")
+
+# Сборщик: (repo_path, scan) -> (зависимости по экосистемам, версии языков, версии фреймворков)
+Collector = Callable[
+    [Path, ScanResult],
+    Tuple[Dict[str, Dict[str, str]], Dict[str, str], Dict[str, str]],
+]
+
+
+def _select_collectors(repo_path: Path, scan: ScanResult) -> List[Collector]:
+    """
+    Оставляем только сборщики, которым есть что читать в этом репозитории.
+    Python-сборщик, кроме requirements, берёт версию из pyproject.toml,
+    .python-version и Dockerfile'ов — поэтому учитываем и их.
+    """
+    grouped = scan.grouped
+    collectors: List[Collector] = []
+
+    if (
+        grouped["requirements"]
+        or grouped["pyproject"]
+        or scan.plain_dockerfiles
+        or (repo_path / ".python-version").exists()
+    ):
+        collectors.append(_collect_python)
+    if grouped["package_json"]:
+        collectors.append(_collect_node)
+    if grouped["go_mod"]:
+        collectors.append(_collect_go)
+    if grouped["pom"] or grouped["gradle"]:
+        collectors.append(_collect_java_kotlin)
+
+    return collectors
+
+
 def _detect_dependencies_and_versions(
     repo_path: Path,
+    scan: ScanResult,
     logs: List[str],
 ) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str], Dict[str, str]]:
     """
@@ -631,9 +943,18 @@ def _detect_dependencies_and_versions(
     lang_versions_all: Dict[str, str] = {}
     fw_versions_all: Dict[str, str] = {}
 
-    for collector in (_collect_python, _collect_node, _collect_go, _collect_java_kotlin):
-        deps, lang_ver, fw_ver = collector(repo_path)
+    # Сборщикам ещё остаётся холодное чтение с диска (go.mod, .python-version,
+    # Dockerfile'ы, pom больше 1 МиБ через mmap, файлы после ранних выходов детекторов),
+    # поэтому при двух и более сборщиках запускаем их в общем пуле.
+    # Результаты сливаем в исходном порядке
+    collectors = _select_collectors(repo_path, scan)
+    if len(collectors) > 1:
+        futures = [_COLLECTOR_POOL.submit(collector, repo_path, scan) for collector in collectors]
+        results = [f.result() for f in futures]
+    else:
+        results = [collector(repo_path, scan) for collector in collectors]
 
+    for deps, lang_ver, fw_ver in results:
         for eco, pkgs in deps.items():
             dst = deps_all.setdefault(eco, {})
             dst.update(pkgs)
@@ -665,25 +986,15 @@ def _detect_dependencies_and_versions(
     return deps_all, lang_versions_all, fw_versions_all
 
 
-def _detect_deploy_artifacts(repo_path: Path, logs: List[str]) -> Tuple[bool, bool, bool]:
+def _detect_deploy_artifacts(scan: ScanResult, logs: List[str]) -> Tuple[bool, bool, bool]:
     """
     Определяем, есть ли Dockerfile, docker-compose и (очень грубо) k8s-манифесты.
+    Сами флаги выставляются в _scan_repo.
     """
-    has_dockerfile = False
-    has_docker_compose = False
-    has_k8s = False
-
     click.echo("Определяем Docker/k8s-артефакты...")
-    for file_path in _iter_files(repo_path):
-        name = file_path.name.lower()
-        if name == "dockerfile" or name.startswith("dockerfile."):
-            has_dockerfile = True
-        if name in {"docker-compose.yml", "docker-compose.yaml"}:
-            has_docker_compose = True
-        if name.endswith((".yml", ".yaml")) and any(
-            part in {"k8s", "kubernetes", "manifests"} for part in file_path.parts
-        ):
-            has_k8s = True
+    has_dockerfile = scan.has_dockerfile
+    has_docker_compose = scan.has_docker_compose
+    has_k8s = scan.has_k8s
 
     logs.append(
         f"Dockerfile: {has_dockerfile}, docker-compose: {has_docker_compose}, k8s-манифесты: {has_k8s}"
@@ -694,11 +1005,27 @@ def _detect_deploy_artifacts(repo_path: Path, logs: List[str]) -> Tuple[bool, bo
     return has_dockerfile, has_docker_compose, has_k8s
 
 
+# Менеджеры пакетов по экосистемам: язык без своего менеджера может оказаться "шумом"
+_ECO_PMS: Dict[str, frozenset[str]] = {
+    "python": frozenset({"pip", "poetry", "pipenv"}),
+    "javascript": frozenset({"npm", "yarn", "pnpm"}),
+    "java": frozenset({"maven", "gradle"}),
+    "go": frozenset({"go-mod"}),
+}
+
+
 def analyze_stack(repo_path: Path) -> Tuple[StackInfo, List[str], List[str]]:
     """
     Основная функция анализа репозитория.
     Возвращает StackInfo + лог и варнинги.
     """
+    try:
+        return _analyze_stack(repo_path)
+    finally:
+        _clear_file_caches()
+
+
+def _analyze_stack(repo_path: Path) -> Tuple[StackInfo, List[str], List[str]]:
     click.echo(f"Начинаем анализ репозитория: {repo_path}")
 
     logs: List[str] = [f"Начинаем анализ репозитория: {repo_path}"]
@@ -710,37 +1037,36 @@ def analyze_stack(repo_path: Path) -> Tuple[StackInfo, List[str], List[str]]:
         logs.append("Путь к репозиторию не найден.")
         return StackInfo(), logs, warnings
 
+    # Один обход репозитория; результаты переиспользуем во всех детекторах
+    scan = _scan_repo(repo_path)
+    grouped = scan.grouped
+
     # 1. Языки + количество файлов
-    languages, lang_counts = _detect_languages(repo_path, logs)
+    languages, lang_counts = _detect_languages(scan, logs)
 
     # 2. Менеджеры пакетов
-    package_managers = _detect_package_managers(repo_path, logs)
+    package_managers = _detect_package_managers(grouped, logs)
 
     # 3. Фреймворки
-    frameworks = _detect_frameworks(repo_path, languages, logs)
+    frameworks = _detect_frameworks(grouped, languages, logs)
 
     # 4. Docker / docker-compose / k8s
-    has_dockerfile, has_docker_compose, has_k8s = _detect_deploy_artifacts(repo_path, logs)
+    has_dockerfile, has_docker_compose, has_k8s = _detect_deploy_artifacts(scan, logs)
 
     # 5. Зависимости и версии
-    dependencies, language_versions, framework_versions = _detect_dependencies_and_versions(repo_path, logs)
+    dependencies, language_versions, framework_versions = _detect_dependencies_and_versions(repo_path, scan, logs)
 
     # 6. Убираем "шумовые" языки (один файл + нет профильного менеджера пакетов)
-    filtered_languages = list(languages)
-    ECO_PMS: Dict[str, set[str]] = {
-        "python": {"pip", "poetry", "pipenv"},
-        "javascript": {"npm", "yarn", "pnpm"},
-        "java": {"maven", "gradle"},
-        "go": {"go-mod"},
-    }
-
-    for lang in list(filtered_languages):
-        pms_for_lang = ECO_PMS.get(lang)
+    noise_languages: set[str] = set()
+    package_managers_set = set(package_managers)
+
+    for lang in languages:
+        pms_for_lang = _ECO_PMS.get(lang)
         if not pms_for_lang:
             continue
 
         files_count = lang_counts.get(lang, 0)
-        has_pm = any(pm in pms_for_lang for pm in package_managers)
+        has_pm = not pms_for_lang.isdisjoint(package_managers_set)
 
         if files_count <= 1 and not has_pm:
             warnings.append(
@@ -755,16 +1081,20 @@ def analyze_stack(repo_path: Path) -> Tuple[StackInfo, List[str], List[str]]:
                 f"{lang} исключён из основного стека "
                 f"(файлов={files_count}, менеджеры пакетов {sorted(pms_for_lang)} не обнаружены)."
             )
-            filtered_languages.remove(lang)
+            noise_languages.add(lang)
+
+    filtered_languages = [lang for lang in languages if lang not in noise_languages]
 
     # Объединяем фреймворки из грубого детекта и из версий
-    frameworks_all = sorted(set(frameworks) | set(framework_versions.keys()))
+    fw_set = set(frameworks)
+    fw_set.update(framework_versions)
+    frameworks_all = sorted(fw_set)
 
     stack = StackInfo(
         languages=sorted(filtered_languages),
         frameworks=frameworks_all,
         package_managers=package_managers,
-        dockerfiles=_detect_dockerfiles(repo_path),
+        dockerfiles=_detect_dockerfiles(repo_path, scan.dockerfiles),
         has_dockerfile=has_dockerfile,
         has_docker_compose=has_docker_compose,
         has_k8s_manifests=has_k8s,
@@ -1,42 +1,163 @@
 import click
 
-from typing import List, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 from core.models import StackInfo, PipelineSummary, DockerfileInfo
 from model import Pipeline, Job
 
 
+def _emit(msg: str, logs: List[str]) -> None:
+    """
+    Печатает сообщение и дублирует его в logs (строка форматируется один раз).
+    """
+    click.echo(msg)
+    logs.append(msg)
+
+
 def _ensure_stage(stages: List[str], stage: str) -> None:
     if stage not in stages:
         stages.append(stage)
 
 
-def _has_node(stack: StackInfo) -> bool:
-    # js/ts или типичные js-фреймворки
-    if any(lang in ("javascript", "typescript") for lang in stack.languages):
-        return True
+# Канонический порядок стадий: имя -> позиция
+_STAGE_RANK = {
+    name: i for i, name in enumerate(("lint", "test", "quality", "build", "docker", "deploy"))
+}
+
+# '-' и '.' в имени сервиса недопустимы/неудобны в имени job'а — заменяем на '_'
+_JOB_NAME_SLUG = str.maketrans({"-": "_", ".": "_"})
+
+# Признаки Node.js-проекта: js/ts или типичные js-фреймворки
+_NODE_LANGS = frozenset({"javascript", "typescript"})
+_NODE_FRAMEWORKS = frozenset({"vue", "react", "angular", "express", "nestjs"})
+# Менеджеры пакетов Node в порядке приоритета (по умолчанию npm)
+_NODE_PM_PRIORITY = ("yarn", "pnpm")
+
+
+# Неизменяемые шаблоны скриптов job'ов: строки создаются один раз на модуль
+_PYTHON_TEST_SCRIPT: Tuple[str, ...] = (
+    "if [ -f requirements.txt ]; then python -m pip install -r requirements.txt; "
+    "else echo 'requirements.txt не найден — пропускаем установку зависимостей'; fi",
+    "python -m pip install pytest || true",
+    "pytest || echo 'pytest не настроен или тесты отсутствуют — отредактируйте команду'",
+)
+_PYTHON_LINT_SCRIPT: Tuple[str, ...] = (
+    "python -m pip install flake8 || echo 'flake8 не установлен'",
+    "flake8 . || echo 'flake8 нашёл замечания или не настроен — отредактируйте команду'",
+)
+_GO_TEST_SCRIPT: Tuple[str, ...] = (
+    "go test ./... || echo 'go test завершился с ошибкой — проверьте тесты'",
+)
+_GO_BUILD_SCRIPT: Tuple[str, ...] = (
+    "go build ./... || echo 'go build завершился с ошибкой — "
+    "проверьте конфигурацию проекта'",
+)
+_JAVA_TEST_SCRIPT: Tuple[str, ...] = (
+    "if [ -f mvnw ]; then chmod +x mvnw; ./mvnw -B test; "
+    "else mvn -B test; fi || echo 'mvn test завершился с ошибкой — "
+    "отредактируйте pom.xml/профили'",
+)
+_JAVA_BUILD_SCRIPT: Tuple[str, ...] = (
+    "if [ -f mvnw ]; then chmod +x mvnw; ./mvnw -B package -DskipTests; "
+    "else mvn -B package -DskipTests; fi || echo 'mvn package завершился с ошибкой — "
+    "проверьте pom.xml'",
+)
+_JAVA_SONAR_SCRIPT: Tuple[str, ...] = (
+    "if [ -f mvnw ]; then chmod +x mvnw; ./mvnw -B verify sonar:sonar; "
+    "else mvn -B verify sonar:sonar; fi || echo 'SonarQube не настроен — "
+    "укажите параметры sonar.* и переменные окружения SONAR_*'",
+)
+_NODE_SONAR_SCRIPT: Tuple[str, ...] = (
+    "echo 'TODO: добавьте команду запуска SonarQube для фронтенда "
+    "(например, npx sonar-scanner ...)'",
+)
+_DOCKER_FALLBACK_SCRIPT: Tuple[str, ...] = (
+    'echo "Сборка Docker-образа. Настройте свой registry и docker runner."',
+    "docker build -t my-image:latest . || echo 'Настройте docker daemon / registry'",
+)
+_DEPLOY_SCRIPT: Tuple[str, ...] = (
+    'echo "TODO: добавьте реальные команды деплоя (kubectl / ssh / helm и т.п.)"',
+)
+
+
+# Команды Node.js по менеджеру пакетов: (install, test, build, lint)
+_NODE_CMDS: Dict[str, Tuple[str, str, str, str]] = {
+    # corepack для yarn 3/4 или глобальная установка
+    "yarn": (
+        "corepack enable || npm i -g yarn; "
+        "yarn install --frozen-lockfile || yarn install",
+        "yarn test || echo 'yarn test не настроен — отредактируйте команду'",
+        "yarn build || echo 'yarn build не настроен — отредактируйте команду'",
+        "yarn lint || echo 'yarn lint не настроен — отредактируйте команду'",
+    ),
+    # pnpm в node:20-alpine нет → ставим через corepack или npm
+    "pnpm": (
+        "corepack enable || npm i -g pnpm; pnpm install",
+        "pnpm test || echo 'pnpm test не настроен — отредактируйте команду'",
+        "pnpm build || echo 'pnpm build не настроен — отредактируйте команду'",
+        "pnpm lint || echo 'pnpm lint не настроен — отредактируйте команду'",
+    ),
+    "npm": (
+        "npm ci || npm install",
+        "npm test || echo 'npm test не настроен — отредактируйте команду'",
+        "npm run build || echo 'npm run build не настроен — отредактируйте команду'",
+        "npm run lint || echo 'npm run lint не настроен — отредактируйте команду'",
+    ),
+}
+
+
+@dataclass(slots=True)
+class StackSets:
+    """
+    Языки / фреймворки / менеджеры пакетов стека в виде множеств.
+    Строятся один раз в build_pipeline, чтобы проверки "x in ..." не сканировали списки.
+    """
+    languages: frozenset[str]
+    frameworks: frozenset[str]
+    package_managers: frozenset[str]
+
+    @classmethod
+    def from_stack(cls, stack: StackInfo) -> "StackSets":
+        return cls(
+            languages=frozenset(stack.languages),
+            frameworks=frozenset(stack.frameworks),
+            package_managers=frozenset(stack.package_managers),
+        )
 
-    if any(
-        fw in ("vue", "react", "angular", "express", "nestjs")
-        for fw in stack.frameworks
-    ):
-        return True
 
-    return False
+# Оба признака — чистые функции от неизменяемых множеств стека, поэтому кэшируем их:
+# сервис строит пайплайны для множества однотипных стеков подряд
+@lru_cache(maxsize=256)
+def _has_node_cached(languages: frozenset[str], frameworks: frozenset[str]) -> bool:
+    return not (
+        languages.isdisjoint(_NODE_LANGS)
+        and frameworks.isdisjoint(_NODE_FRAMEWORKS)
+    )
 
 
-def _node_pm(stack: StackInfo) -> str:
+@lru_cache(maxsize=256)
+def _node_pm_cached(package_managers: frozenset[str]) -> str:
     # очень грубый выбор менеджера пакетов
-    if "yarn" in stack.package_managers:
-        return "yarn"
-    if "pnpm" in stack.package_managers:
-        return "pnpm"
+    for pm in _NODE_PM_PRIORITY:
+        if pm in package_managers:
+            return pm
     # по умолчанию npm
     return "npm"
 
 
+def _has_node(sets: StackSets) -> bool:
+    return _has_node_cached(sets.languages, sets.frameworks)
+
+
+def _node_pm(sets: StackSets) -> str:
+    return _node_pm_cached(sets.package_managers)
+
+
 def _append_quality_jobs(
-    stack: StackInfo,
+    sets: StackSets,
+    has_node: bool,
     stages: List[str],
     jobs: List[Job],
     logs: List[str],
@@ -45,11 +166,9 @@ def _append_quality_jobs(
     """
     Добавляем stage quality и SonarQube-плейсхолдеры, если стек это позволяет.
     Сейчас покрываем Java (maven) и Node.js-проекты.
+    has_node уже посчитан в build_pipeline и передаётся, а не вычисляется заново.
     """
-    has_java = "java" in getattr(stack, "languages", []) and "maven" in getattr(
-        stack, "package_managers", []
-    )
-    has_node = _has_node(stack)
+    has_java = "java" in sets.languages and "maven" in sets.package_managers
 
     if not (has_java or has_node):
         return
@@ -63,11 +182,7 @@ def _append_quality_jobs(
                 name="java_sonar",
                 stage="quality",
                 image="maven:3.9-eclipse-temurin-17",
-                script=[
-                    "if [ -f mvnw ]; then chmod +x mvnw; ./mvnw -B verify sonar:sonar; "
-                    "else mvn -B verify sonar:sonar; fi || echo 'SonarQube не настроен — "
-                    "укажите параметры sonar.* и переменные окружения SONAR_*'",
-                ],
+                script=list(_JAVA_SONAR_SCRIPT),
             )
         )
         logs.append("Добавлена задача качества java_sonar (SonarQube для Maven-проекта).")
@@ -79,10 +194,7 @@ def _append_quality_jobs(
                 name="node_sonar",
                 stage="quality",
                 image="node:20-alpine",
-                script=[
-                    "echo 'TODO: добавьте команду запуска SonarQube для фронтенда "
-                    "(например, npx sonar-scanner ...)'",
-                ],
+                script=list(_NODE_SONAR_SCRIPT),
             )
         )
         logs.append(
@@ -103,17 +215,18 @@ def build_pipeline(stack: StackInfo) -> Tuple[Pipeline, List[str], List[str]]:
     """
     logs: List[str] = []
     warnings: List[str] = []
-    click.echo(f"Строим пайплайн по стеку: {stack.dict()}")
-    logs.append(f"Строим пайплайн по стеку: {stack.dict()}")
+    # model_dump() копирует всю модель со вложенными словарями — делаем это один раз
+    _emit(f"Строим пайплайн по стеку: {stack.model_dump()}", logs)
 
     stages: List[str] = []
     jobs: List[Job] = []
 
-    has_python = "python" in stack.languages
-    has_node = _has_node(stack)
-    has_go = "go" in stack.languages
-    has_java = "java" in stack.languages
-    pm_node = _node_pm(stack) if has_node else None
+    sets = StackSets.from_stack(stack)
+    has_python = "python" in sets.languages
+    has_node = _has_node(sets)
+    has_go = "go" in sets.languages
+    has_java = "java" in sets.languages
+    pm_node = _node_pm(sets) if has_node else None
     dockerfiles:List[DockerfileInfo] = getattr(stack, "dockerfiles", []) or []
 
     # --- Python: test / lint ---
@@ -122,37 +235,24 @@ def build_pipeline(stack: StackInfo) -> Tuple[Pipeline, List[str], List[str]]:
         _ensure_stage(stages, "test")
 
         click.echo("Установка зависимостей Python")
-        python_test_script = [
-            "if [ -f requirements.txt ]; then python -m pip install -r requirements.txt; "
-            "else echo 'requirements.txt не найден — пропускаем установку зависимостей'; fi",
-            "python -m pip install pytest || true",
-            "pytest || echo 'pytest не настроен или тесты отсутствуют — отредактируйте команду'",
-        ]
-
         jobs.append(
             Job(
                 name="python_tests",
                 stage="test",
                 image="python:3.11-slim",
-                script=python_test_script,
+                script=list(_PYTHON_TEST_SCRIPT),
             )
         )
 
-        python_lint_script = [
-            "python -m pip install flake8 || echo 'flake8 не установлен'",
-            "flake8 . || echo 'flake8 нашёл замечания или не настроен — отредактируйте команду'",
-        ]
-
         jobs.append(
             Job(
                 name="python_lint",
                 stage="lint",
                 image="python:3.11-slim",
-                script=python_lint_script,
+                script=list(_PYTHON_LINT_SCRIPT),
             )
         )
-        click.echo("Добавлены задачи для Python: python_tests, python_lint")
-        logs.append("Добавлены задачи для Python: python_tests, python_lint")
+        _emit("Добавлены задачи для Python: python_tests, python_lint", logs)
 
     # --- Node.js / фронт ---
     if has_node and pm_node:
@@ -162,30 +262,7 @@ def build_pipeline(stack: StackInfo) -> Tuple[Pipeline, List[str], List[str]]:
 
         click.echo("Настраиваем задачи для Node.js / фронтенда")
 
-        if pm_node == "yarn":
-            # corepack для yarn 3/4 или глобальная установка
-            install_cmd = (
-                "corepack enable || npm i -g yarn; "
-                "yarn install --frozen-lockfile || yarn install"
-            )
-            test_cmd = "yarn test || echo 'yarn test не настроен — отредактируйте команду'"
-            build_cmd = "yarn build || echo 'yarn build не настроен — отредактируйте команду'"
-            lint_cmd = "yarn lint || echo 'yarn lint не настроен — отредактируйте команду'"
-        elif pm_node == "pnpm":
-            # pnpm в node:20-alpine нет → ставим через corepack или npm
-            install_cmd = "corepack enable || npm i -g pnpm; pnpm install"
-            test_cmd = "pnpm test || echo 'pnpm test не настроен — отредактируйте команду'"
-            build_cmd = "pnpm build || echo 'pnpm build не настроен — отредактируйте команду'"
-            lint_cmd = "pnpm lint || echo 'pnpm lint не настроен — отредактируйте команду'"
-        else:
-            install_cmd = "npm ci || npm install"
-            test_cmd = "npm test || echo 'npm test не настроен — отредактируйте команду'"
-            build_cmd = (
-                "npm run build || echo 'npm run build не настроен — отредактируйте команду'"
-            )
-            lint_cmd = (
-                "npm run lint || echo 'npm run lint не настроен — отредактируйте команду'"
-            )
+        install_cmd, test_cmd, build_cmd, lint_cmd = _NODE_CMDS.get(pm_node, _NODE_CMDS["npm"])
 
         jobs.append(
             Job(
@@ -214,8 +291,7 @@ def build_pipeline(stack: StackInfo) -> Tuple[Pipeline, List[str], List[str]]:
                 artifacts=["dist"],
             )
         )
-        click.echo("Добавлены задачи для Node.js: node_lint, node_tests, node_build")
-        logs.append("Добавлены задачи для Node.js: node_lint, node_tests, node_build")
+        _emit("Добавлены задачи для Node.js: node_lint, node_tests, node_build", logs)
 
     # --- Go ---
     if has_go:
@@ -229,9 +305,7 @@ def build_pipeline(stack: StackInfo) -> Tuple[Pipeline, List[str], List[str]]:
                 name="go_tests",
                 stage="test",
                 image="golang:1.22",
-                script=[
-                    "go test ./... || echo 'go test завершился с ошибкой — проверьте тесты'"
-                ],
+                script=list(_GO_TEST_SCRIPT),
             )
         )
 
@@ -240,17 +314,14 @@ def build_pipeline(stack: StackInfo) -> Tuple[Pipeline, List[str], List[str]]:
                 name="go_build",
                 stage="build",
                 image="golang:1.22",
-                script=[
-                    "go build ./... || echo 'go build завершился с ошибкой — "
-                    "проверьте конфигурацию проекта'",
-                ],
+                script=list(_GO_BUILD_SCRIPT),
             )
         )
 
         logs.append("Добавлены задачи для Go: go_tests, go_build")
 
     # --- Java (Maven) ---
-    if has_java and "maven" in stack.package_managers:
+    if has_java and "maven" in sets.package_managers:
         _ensure_stage(stages, "test")
         _ensure_stage(stages, "build")
 
@@ -261,11 +332,7 @@ def build_pipeline(stack: StackInfo) -> Tuple[Pipeline, List[str], List[str]]:
                 name="java_tests",
                 stage="test",
                 image="maven:3.9-eclipse-temurin-17",
-                script=[
-                    "if [ -f mvnw ]; then chmod +x mvnw; ./mvnw -B test; "
-                    "else mvn -B test; fi || echo 'mvn test завершился с ошибкой — "
-                    "отредактируйте pom.xml/профили'",
-                ],
+                script=list(_JAVA_TEST_SCRIPT),
             )
         )
 
@@ -274,35 +341,25 @@ def build_pipeline(stack: StackInfo) -> Tuple[Pipeline, List[str], List[str]]:
                 name="java_build",
                 stage="build",
                 image="maven:3.9-eclipse-temurin-17",
-                script=[
-                    "if [ -f mvnw ]; then chmod +x mvnw; ./mvnw -B package -DskipTests; "
-                    "else mvn -B package -DskipTests; fi || echo 'mvn package завершился с ошибкой — "
-                    "проверьте pom.xml'",
-                ],
+                script=list(_JAVA_BUILD_SCRIPT),
             )
         )
 
         logs.append("Добавлены задачи для Java: java_tests, java_build")
 
     # --- Quality / SonarQube ---
-    _append_quality_jobs(stack, stages, jobs, logs, warnings)
+    _append_quality_jobs(sets, has_node, stages, jobs, logs, warnings)
 
     # --- Docker / deploy ---
     # Если анализатор нашёл конкретные Dockerfile'ы, делаем по job'у на каждый
     if dockerfiles:
         _ensure_stage(stages, "docker")
-        click.echo(
-            "Обнаружены Dockerfile'ы: "
-            + ", ".join(df.path for df in dockerfiles)
-        )
-        logs.append(
-            "Обнаружены Dockerfile'ы: "
-            + ", ".join(df.path for df in dockerfiles)
-        )
+        df_paths = ", ".join(df.path for df in dockerfiles)
+        _emit(f"Обнаружены Dockerfile'ы: {df_paths}", logs)
 
         for df in dockerfiles:
             # имя job'а из логического имени сервиса
-            job_name = f"docker_build_{df.name.replace('-', '_').replace('.', '_')}"
+            job_name = f"docker_build_{df.name.translate(_JOB_NAME_SLUG)}"
             image_ref = f"my-image-{df.name}:latest"  # осмысленный, но безопасный плейсхолдер
 
             docker_script = [
@@ -335,16 +392,12 @@ def build_pipeline(stack: StackInfo) -> Tuple[Pipeline, List[str], List[str]]:
     # но список dockerfiles пуст (например, старые данные / неполный анализ).
     elif stack.has_dockerfile:
         _ensure_stage(stages, "docker")
-        docker_script = [
-            'echo "Сборка Docker-образа. Настройте свой registry и docker runner."',
-            "docker build -t my-image:latest . || echo 'Настройте docker daemon / registry'",
-        ]
         jobs.append(
             Job(
                 name="docker_build",
                 stage="docker",
                 image="docker:24",
-                script=docker_script,
+                script=list(_DOCKER_FALLBACK_SCRIPT),
             )
         )
         click.echo(
@@ -360,14 +413,11 @@ def build_pipeline(stack: StackInfo) -> Tuple[Pipeline, List[str], List[str]]:
         )
 
     _ensure_stage(stages, "deploy")
-    deploy_script = [
-        'echo "TODO: добавьте реальные команды деплоя (kubectl / ssh / helm и т.п.)"'
-    ]
     jobs.append(
         Job(
             name="deploy_placeholder",
             stage="deploy",
-            script=deploy_script,
+            script=list(_DEPLOY_SCRIPT),
         )
     )
 
@@ -377,30 +427,18 @@ def build_pipeline(stack: StackInfo) -> Tuple[Pipeline, List[str], List[str]]:
             "Пайплайн содержит только placeholder-задачи. "
             "Отредактируйте команды под ваш стек."
         )
-        click.echo("Построен пайплайн по умолчанию (без специфики языка).")
-        logs.append("Построен пайплайн по умолчанию (без специфики языка).")
-
-    # Приводим стадии к каноническому порядку
-    if stages:
-        unique = list(dict.fromkeys(stages))
-        canonical_order = ["lint", "test", "quality", "build", "docker", "deploy"]
-        ordered_stages: List[str] = []
-        for name in canonical_order:
-            if name in unique:
-                ordered_stages.append(name)
-        # на всякий случай добавим нестандартные стадии в конец
-        for name in unique:
-            if name not in ordered_stages:
-                ordered_stages.append(name)
-    else:
-        ordered_stages = []
+        _emit("Построен пайплайн по умолчанию (без специфики языка).", logs)
 
-    pipeline = Pipeline(stages=ordered_stages, jobs=jobs)
-    logs.append(
-        f"Пайплайн сформирован: {len(pipeline.stages)} стадий и {len(pipeline.jobs)} задач."
+    # Приводим стадии к каноническому порядку; нестандартные стадии
+    # (на всякий случай) уходят в конец в порядке добавления — sorted устойчив
+    ordered_stages = sorted(
+        dict.fromkeys(stages), key=lambda name: _STAGE_RANK.get(name, len(_STAGE_RANK))
     )
-    click.echo(
-        f"Пайплайн сформирован: {len(pipeline.stages)} стадий и {len(pipeline.jobs)} задач."
+
+    pipeline = Pipeline(stages=ordered_stages, jobs=jobs)
+    _emit(
+        f"Пайплайн сформирован: {len(pipeline.stages)} стадий и {len(pipeline.jobs)} задач.",
+        logs,
     )
 
     return pipeline, logs, warnings
@@ -418,14 +456,12 @@ def summarize_pipeline(pipeline: Pipeline) -> PipelineSummary:
     if stages_count == 0 and jobs_count == 0:
         description = "Пайплайн пустой. Отредактируйте конфигурацию."
     else:
+        joined = ", ".join(stages)
         description = (
             f"Сгенерирован пайплайн из {stages_count} стадий и {jobs_count} задач: "
-            f"стадии {', '.join(stages)}."
+            f"стадии {joined}."
         )
-    click.echo(
-        f"Сгенерирован пайплайн из {stages_count} стадий и {jobs_count} задач: "
-        f"стадии {', '.join(stages)}."
-    )
+    click.echo(description)
 
     return PipelineSummary(
         stages_count=stages_count,
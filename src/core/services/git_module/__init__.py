@@ -1,5 +1,3 @@
-from .core import GitRepo2Pipe
-
 from .exceptions import (
     GitExceptions,
     GitCloneError,
@@ -7,6 +5,16 @@ from .exceptions import (
     GitLocalPathError,
 )
 
+
+def __getattr__(name):
+    # GitRepo2Pipe тянет за собой GitPython — импортируем его только по запросу,
+    # чтобы импорт исключений/моделей пакета оставался дешёвым.
+    if name == "GitRepo2Pipe":
+        from .core import GitRepo2Pipe
+        return GitRepo2Pipe
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "Git",
     "LocalRepo",
@@ -6,18 +6,106 @@ from git import (
 )
 
 from pathlib import Path
-from typing import List
-from core.config import BASE_TEMP_DIR
+from typing import Callable, Dict, List, Tuple
+from core.config import ensure_base_temp_dir
 
 from .models import LocalRepo
-from .utils import ensure_base_temp_dir, PathLike
+from .utils import PathLike
 from .exceptions import GitCloneError, GitArchiveError, GitLocalPathError
 
+import asyncio
+import functools
+import os
 import shutil
 import tempfile
 import zipfile
 import tarfile
 
+# Буфер чтения архива и копирования файлов при распаковке (вместо стандартных 8–64 КБ)
+_EXTRACT_BUFSIZE = 1024 * 1024
+
+
+# Символы, недопустимые в именах файлов Windows (как в zipfile.ZipFile._sanitize_windows_name)
+_WIN_ILLEGAL_CHARS = str.maketrans(':<>|"?*', "_" * 7)
+
+
+def _zip_member_name(filename: str) -> str:
+    """
+    Имя элемента zip для текущей ОС. На Windows, как и zipfile.extractall,
+    заменяет недопустимые символы на "_" и отбрасывает точки в конце компонентов.
+    Абсолютные пути, диски и компоненты "." / ".." не трогаем — их отсекает
+    проверка пути в _extract_zip.
+    """
+    if os.sep != "\\" or os.path.splitdrive(filename)[0] or filename.startswith(("/", "\\")):
+        return filename
+    parts = filename.replace("/", "\\").split("\\")
+    parts = [p if p in (".", "..") else p.translate(_WIN_ILLEGAL_CHARS).rstrip(".") for p in parts]
+    return "\\".join(p for p in parts if p)
+
+
+def _extract_zip(archive: Path, dest: Path) -> None:
+    """
+    Распаковывает zip-архив в dest, копируя файлы крупными блоками.
+    В отличие от zipfile.extractall, элементы с путями за пределами dest
+    (../, абсолютные) не исправляются молча, а считаются ошибкой архива.
+
+    :raises zipfile.BadZipFile: если архив битый или содержит небезопасные пути.
+    """
+    dest_real = os.path.realpath(dest)
+    with open(archive, "rb", buffering=_EXTRACT_BUFSIZE) as raw, zipfile.ZipFile(raw, "r") as zf:
+        for member in zf.infolist():
+            name = _zip_member_name(member.filename)
+            if not name:
+                continue
+            target = os.path.realpath(os.path.join(dest_real, name))
+            if target != dest_real and not target.startswith(dest_real + os.sep):
+                raise zipfile.BadZipFile(f"Небезопасный путь в архиве: {member.filename}")
+
+            if member.is_dir():
+                os.makedirs(target, exist_ok=True)
+                continue
+
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with zf.open(member, "r") as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, _EXTRACT_BUFSIZE)
+
+
+def _extract_tar(archive: Path, dest: Path) -> None:
+    """
+    Распаковывает tar(.gz/.bz2)-архив в dest. Где доступно (3.12+ и свежие патч-релизы),
+    используется filter="data": он отсекает небезопасные пути, ссылки и права.
+
+    :raises tarfile.TarError: если архив битый или содержит небезопасные элементы.
+    """
+    with open(archive, "rb", buffering=_EXTRACT_BUFSIZE) as raw, tarfile.open(fileobj=raw, mode="r:*") as tf:
+        if hasattr(tarfile, "data_filter"):
+            tf.extractall(dest, filter="data")
+        else:
+            tf.extractall(dest)
+
+
+# Суффикс архива -> (название формата для логов, функция распаковки)
+_ARCHIVE_FORMATS: Dict[str, Tuple[str, Callable[[Path, Path], None]]] = {
+    ".zip": ("zip", _extract_zip),
+    ".tar": ("tar", _extract_tar),
+    ".tar.gz": ("tar", _extract_tar),
+    ".tgz": ("tar", _extract_tar),
+    ".tar.bz2": ("tar", _extract_tar),
+}
+
+
+def _archive_format(archive: Path) -> Tuple[str, Callable[[Path, Path], None]] | None:
+    """
+    Формат архива по суффиксу: сначала составной (.tar.gz), затем одиночный (.zip).
+    """
+    suffixes = [suffix.lower() for suffix in archive.suffixes[-2:]]
+    if len(suffixes) == 2:
+        archive_format = _ARCHIVE_FORMATS.get("".join(suffixes))
+        if archive_format is not None:
+            return archive_format
+    return _ARCHIVE_FORMATS.get(suffixes[-1]) if suffixes else None
+
+
 class GitRepo2Pipe:
     """
     Высокоуровневый фасад для работы с репозиторием в трёх режимах:
@@ -51,7 +139,7 @@ class GitRepo2Pipe:
 
         logs: List[str] = []
 
-        base_temp = ensure_base_temp_dir(BASE_TEMP_DIR)
+        base_temp = ensure_base_temp_dir()
         temp_root = Path(
             tempfile.mkdtemp(prefix="repo_", dir=base_temp)
         )
@@ -62,11 +150,16 @@ class GitRepo2Pipe:
 
         repo_obj: GitRepo | None = None
         try:
-            repo_obj = GitRepo.clone_from(
-                repo,
-                repo_dir,
-                branch=branch,
-                depth=1,
+            # clone_from блокирующий — уводим его в поток, чтобы не стопорить event loop
+            repo_obj = await asyncio.get_running_loop().run_in_executor(
+                None,
+                functools.partial(
+                    GitRepo.clone_from,
+                    repo,
+                    repo_dir,
+                    branch=branch,
+                    depth=1,
+                ),
             )
             logs.append(f"Репозиторий успешно клонирован в {repo_dir}")
         except GitCommandError as e:
@@ -113,7 +206,7 @@ class GitRepo2Pipe:
             logs.append("Ошибка: указанный путь не является файлом архива.")
             raise GitArchiveError(archive_path=str(archive), logs=logs)
 
-        base_temp = ensure_base_temp_dir(BASE_TEMP_DIR)
+        base_temp = ensure_base_temp_dir()
         temp_root = Path(
             tempfile.mkdtemp(prefix="archive_", dir=base_temp)
         )
@@ -123,22 +216,13 @@ class GitRepo2Pipe:
         logs.append(f"Создаём временную папку для архива: {temp_root}")
         logs.append(f"Распаковываем архив в {repo_dir}")
 
-        name_lower = archive.name.lower()
+        archive_format = _archive_format(archive)
 
         try:
-            if name_lower.endswith(".zip"):
-                logs.append("Определён формат архива: zip")
-                with zipfile.ZipFile(archive, "r") as zf:
-                    zf.extractall(repo_dir)
-            elif (
-                name_lower.endswith(".tar")
-                or name_lower.endswith(".tar.gz")
-                or name_lower.endswith(".tgz")
-                or name_lower.endswith(".tar.bz2")
-            ):
-                logs.append("Определён формат архива: tar")
-                with tarfile.open(archive, "r:*") as tf:
-                    tf.extractall(repo_dir)
+            if archive_format is not None:
+                format_name, extract = archive_format
+                logs.append(f"Определён формат архива: {format_name}")
+                extract(archive, repo_dir)
             else:
                 logs.append(
                     "Неизвестный формат архива. Поддерживаются: "
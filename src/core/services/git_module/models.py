@@ -1,9 +1,28 @@
 import shutil
+import subprocess
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import List
 from .utils import on_rm_error
 
+def _rm_rf(path: Path) -> bool:
+    """
+    Удаляет дерево через системный rm -rf. Возвращает True, если директории больше нет.
+    """
+    try:
+        subprocess.run(
+            ["rm", "-rf", "--", str(path)],
+            check=False,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        # rm недоступен (нет в PATH / не запускается)
+        return False
+    return not path.exists()
+
+
 @dataclass
 class LocalRepo:
     """
@@ -27,7 +46,20 @@ class LocalRepo:
         Для существующих локальных путей (is_temporary = False) ничего не делает.
 
         На Windows дополнительно обрабатывает read-only файлы (например, .git/objects/pack),
-        чтобы rmtree реально удалял всё.
+        чтобы rmtree реально удалял всё. На POSIX read-only файлы удаляются и так,
+        поэтому обработчика там нет, а удаление — best-effort (ignore_errors).
         """
-        if self.is_temporary and self.root_dir.exists():
+        if not (self.is_temporary and self.root_dir.exists()):
+            return
+
+        if on_rm_error is None:
+            # В клонированном репозитории .git/objects — это десятки тысяч мелких файлов:
+            # отдаём удаление нативному rm -rf, а shutil.rmtree оставляем запасным путём
+            if (self.repo_path / ".git").exists() and _rm_rf(self.root_dir):
+                return
+            shutil.rmtree(self.root_dir, ignore_errors=True)
+        elif sys.version_info >= (3, 12):
+            # onerror в 3.12 объявлен устаревшим; onexc получает само исключение
+            shutil.rmtree(self.root_dir, onexc=on_rm_error)
+        else:
             shutil.rmtree(self.root_dir, onerror=on_rm_error)
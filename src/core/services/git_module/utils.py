@@ -1,14 +1,21 @@
 import os
 import stat
+import sys
 from pathlib import Path
 from typing import Union
 
 
 PathLike = Union[str, Path]
 
-def on_rm_error(func, path, exc_info):
+# chmod + повтор нужен только на Windows: там read-only файлы (.git/objects/pack)
+# не удаляются; на POSIX удаление зависит от прав на каталог, а не на файл
+_NEEDS_CHMOD_RETRY = sys.platform == "win32"
+
+
+def _win_on_rm_error(func, path, exc_info):
     """
-    Обработчик ошибок для shutil.rmtree:
+    Обработчик ошибок для shutil.rmtree (подходит и для onerror, и для onexc —
+    третий аргумент не используется):
     - снимает флаг read-only (частый кейс для .git/objects/pack на Windows),
     - повторно вызывает функцию удаления,
     - если снова не получилось — просто проглатывает (cleanup — best-effort).
@@ -16,14 +23,10 @@ def on_rm_error(func, path, exc_info):
     try:
         os.chmod(path, stat.S_IWRITE)
         func(path)
-    except Exception:
+    except OSError:
         # Тут можно было бы залогировать, но в тестовом/CLI-режиме достаточно молча игнорировать.
         pass
 
-def ensure_base_temp_dir(path:str) -> Path:
-    """
-    Гарантирует, что BASE_TEMP_DIR существует, и возвращает его как Path.
-    """
-    base = Path(path)
-    base.mkdir(parents=True, exist_ok=True)
-    return base
+
+# На POSIX обработчика нет (None): rmtree вызывается с ignore_errors=True
+on_rm_error = _win_on_rm_error if _NEEDS_CHMOD_RETRY else None
@@ -1,6 +1,12 @@
-import click
+class CLIException(Exception):
+    """
+    Базовое исключение приложения. Описание только сохраняется —
+    выводить его пользователю решает тот, кто исключение обрабатывает.
+    """
 
-class CLIException(BaseException):
-    def __init__(self, *args, description:str = "Something happend..."):
-        click.echo(description)
-        super().__init__(*args)
\ No newline at end of file
+    def __init__(self, *args, description: str = "Something happend..."):
+        self.description = description
+        super().__init__(description, *args)
+
+    def __str__(self) -> str:
+        return self.description
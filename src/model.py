@@ -1,34 +1,59 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional
 
 
-class Job(BaseModel):
+@dataclass(slots=True)
+class Job:
     """
     Абстрактная задача пайплайна.
     На этом уровне не привязана к GitLab или Jenkins.
+
+    Внутренний value-object: строится билдером и отдаётся рендерам,
+    поэтому обходится без pydantic-валидации на каждое создание.
     """
 
     name: str
     stage: str
-    image: Optional[str] = None
     script: List[str]
+    image: Optional[str] = None
 
-    artifacts: List[str] = None
+    artifacts: Optional[List[str]] = None
     only_branches: Optional[List[str]] = None
     tags: Optional[List[str]] = None   # runner tags (для GitLab)
     when: Optional[str] = None         # on_success, manual и т.п.
     environment: Optional[str] = None  # имя окружения деплоя, если нужно
-    
 
     dockerfile_path: Optional[str] = None
     docker_context: Optional[str] = None
     image_name: Optional[str] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Словарь для сериализации; незаданные (None) необязательные поля опускаются.
+        """
+        data: Dict[str, Any] = {}
+        for name in _JOB_FIELD_NAMES:
+            value = getattr(self, name)
+            if value is None:
+                continue
+            data[name] = list(value) if isinstance(value, list) else value
+        return data
+
 
-class Pipeline(BaseModel):
+_JOB_FIELD_NAMES = tuple(f.name for f in fields(Job))
+
+
+@dataclass(slots=True)
+class Pipeline:
     """
     Абстрактный пайплайн: порядок стадий + набор задач.
     """
 
     stages: List[str]
     jobs: List[Job]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stages": list(self.stages),
+            "jobs": [job.to_dict() for job in self.jobs],
+        }
@@ -1,5 +1,6 @@
 import functools
 import asyncio
+import os
 
 class AsyncContext():
 
@@ -18,4 +19,21 @@ def async_click(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         return asyncio.run(func(*args, **kwargs))
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+def write_file(path: str | os.PathLike[str], data: bytes) -> None:
+    """
+    Записывает уже закодированные байты в файл напрямую через fd:
+    без TextIOWrapper/BufferedWriter, обычно одним системным вызовом write.
+    Права у нового файла как у open(..., "w"): 0o666 с учётом umask.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            # os.write может записать не всё — дописываем остаток без копирования
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
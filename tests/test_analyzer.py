@@ -0,0 +1,102 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.services.analyzer.core import analyze_stack
+from core.services.builders.pipeline import build_pipeline
+
+
+def _write(root: Path, rel: str, content: str) -> None:
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def _analyze(root: Path):
+    # Детекторы печатают прогресс через click.echo — в тестах он не нужен
+    with contextlib.redirect_stdout(io.StringIO()):
+        stack, _, _ = analyze_stack(root)
+        pipeline, _, _ = build_pipeline(stack)
+    return stack, pipeline
+
+
+class DockerfileDetectionTest(unittest.TestCase):
+
+    def test_files_named_like_dockerfile_are_not_built(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _write(root, "go.mod", "module example.com/app\n\ngo 1.22\n")
+            _write(root, "main.go", "package main\n")
+            _write(root, "dockerfile_test.go", "package main\n")
+            _write(root, "docs/dockerfile_notes.md", "# notes\n")
+
+            stack, pipeline = _analyze(root)
+
+        self.assertEqual(stack.dockerfiles, [])
+        self.assertFalse(stack.has_dockerfile)
+        self.assertEqual([j.name for j in pipeline.jobs if j.dockerfile_path], [])
+
+    def test_dockerfile_variants_are_built(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _write(root, "Dockerfile", "FROM python:3.11-slim\n")
+            _write(root, "web/Dockerfile.ui", "FROM node:20\n")
+
+            stack, pipeline = _analyze(root)
+
+        self.assertTrue(stack.has_dockerfile)
+        self.assertEqual(
+            sorted(j.dockerfile_path for j in pipeline.jobs if j.dockerfile_path),
+            ["Dockerfile", "web/Dockerfile.ui"],
+        )
+
+
+# Не проходит XML-парсер: пустая строка перед <?xml?>, &nbsp; и "--" в комментарии
+_MALFORMED_POM = """
+<?xml version="1.0" encoding="UTF-8"?>
+<project>
+  <!-- build -- notes -->
+  <name>demo&nbsp;app</name>
+  <properties><maven.compiler.source>17</maven.compiler.source></properties>
+  <dependencies>
+    <dependency>
+      <groupId>org.springframework.boot</groupId>
+      <artifactId>spring-boot-starter-web</artifactId>
+      <version>3.2.0</version>
+    </dependency>
+    <dependency>
+      <groupId>org.junit.jupiter</groupId>
+      <artifactId>junit-jupiter</artifactId>
+      <version>5.10.0</version>
+    </dependency>
+  </dependencies>
+</project>
+"""
+
+
+class PomParsingTest(unittest.TestCase):
+
+    def test_malformed_pom_falls_back_to_regex(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _write(root, "pom.xml", _MALFORMED_POM)
+            _write(root, "src/main/java/App.java", "class App {}\n")
+
+            stack, pipeline = _analyze(root)
+
+        self.assertEqual(
+            stack.dependencies["java"],
+            {
+                "org.springframework.boot:spring-boot-starter-web": "3.2.0",
+                "org.junit.jupiter:junit-jupiter": "5.10.0",
+            },
+        )
+        self.assertEqual(stack.language_versions["java"], "17")
+        self.assertEqual(stack.framework_versions["junit"], "5.10.0")
+        self.assertIn("java_tests", [j.name for j in pipeline.jobs])
+
+
+if __name__ == "__main__":
+    unittest.main()
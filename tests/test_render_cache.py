@@ -0,0 +1,50 @@
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from core import core
+from model import Job, Pipeline
+
+
+def _pipeline(name: str = "lint") -> Pipeline:
+    return Pipeline(stages=["test"], jobs=[Job(name=name, stage="test", script=["make lint"])])
+
+
+def _render(kind: str, pipeline: Pipeline, key: str) -> tuple[str, str]:
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        template = core._render_cached(kind, pipeline, key)
+    return template, buf.getvalue()
+
+
+class RenderCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        core.Repo2PipeCore.clear_render_cache()
+        self.addCleanup(core.Repo2PipeCore.clear_render_cache)
+
+    def test_hit_prints_same_progress_as_render(self):
+        pipeline = _pipeline()
+        key = core._pipeline_key(pipeline)
+
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
+            expected = core.RENDERERS["gitlab"](pipeline)
+
+        self.assertEqual(_render("gitlab", pipeline, key), (expected, buf.getvalue()))
+        self.assertEqual(_render("gitlab", pipeline, key), (expected, buf.getvalue()))
+
+    def test_hit_refreshes_recency(self):
+        pipeline = _pipeline()
+        with mock.patch.object(core, "_RENDER_CACHE_SIZE", 2):
+            _render("gitlab", pipeline, "a")
+            _render("gitlab", pipeline, "b")
+            _render("gitlab", pipeline, "a")
+            _render("gitlab", pipeline, "c")
+
+        self.assertEqual(list(core._render_cache), [("gitlab", "a"), ("gitlab", "c")])
+
+
+if __name__ == "__main__":
+    unittest.main()